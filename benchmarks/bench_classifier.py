@@ -0,0 +1,71 @@
+"""
+Microbenchmark of the affiliation classifier against the former per-keyword loop.
+
+Usage:
+  poetry run python benchmarks/bench_classifier.py [--authors N] [--unique N]
+"""
+import argparse
+import random
+import timeit
+
+from pubmedfetcher.pubmed_fetcher.classifier import AffiliationClassifier
+
+AFFILIATIONS = [
+  "Department of Neurology, Harvard Medical School, Boston, MA, USA.",
+  "Eisai Inc., Nutley, NJ, USA. Email: someone@eisai.com",
+  "Plant Stress Biology Group, International Centre for Genetic Engineering and Biotechnology, New Delhi, India.",
+  "Center for RNA Research, Institute for Basic Science, Seoul, Republic of Korea.",
+  "Faculty of Medicine, University of Oxford, Oxford, UK.",
+  "Pfizer Worldwide Research and Development, Groton, CT, USA.",
+  "Genentech, Inc., South San Francisco, CA, USA.",
+  "School of Pharmacy, Fudan University, Shanghai, China.",
+  "Novartis Institutes for BioMedical Research, Basel, Switzerland.",
+  "Roche Pharma Research and Early Development, F. Hoffmann-La Roche Ltd, Basel, Switzerland.",
+]
+
+def legacy_is_academic_affiliation(affiliation):
+  """Former implementation: lowercases and scans the affiliation once per keyword."""
+  if not affiliation:
+    return False
+
+  academic_keywords = {'university', 'lab', '.edu.' 'college', 'school of', 'institute of', 'academic', 'academia', 'faculty of'}
+
+  for keyword in academic_keywords:
+    if keyword in affiliation.lower():
+      return True
+  return False
+
+def main():
+  parser = argparse.ArgumentParser(description="Affiliation classifier microbenchmark")
+  parser.add_argument('--authors', type=int, default=200_000, help="Number of affiliations classified. Default=200000.")
+  parser.add_argument('--unique', type=int, default=5_000, help="Number of distinct affiliation strings. Default=5000.")
+  args = parser.parse_args()
+
+  # Distinct affiliations, repeated across authors as in real result sets
+  rng = random.Random(0)
+  unique = [f"{rng.choice(AFFILIATIONS)} ({i})" for i in range(args.unique)]
+  affiliations = [rng.choice(unique) for _ in range(args.authors)]
+
+  def run_legacy():
+    for affiliation in affiliations: legacy_is_academic_affiliation(affiliation)
+
+  def run_classifier():
+    classifier = AffiliationClassifier()
+    for affiliation in affiliations: classifier.is_academic(affiliation)
+
+  def run_classifier_uncached():
+    classifier = AffiliationClassifier(cache_size=0)
+    for affiliation in affiliations: classifier.is_academic(affiliation)
+
+  results = {
+    'legacy per-keyword loop': min(timeit.repeat(run_legacy, number=1, repeat=3)),
+    'classifier, no memoization': min(timeit.repeat(run_classifier_uncached, number=1, repeat=3)),
+    'classifier, memoized': min(timeit.repeat(run_classifier, number=1, repeat=3)),
+  }
+  baseline = results['legacy per-keyword loop']
+  print(f"{args.authors} affiliations, {args.unique} distinct")
+  for name, seconds in results.items():
+    print(f"  {name:<28} {seconds * 1000:8.1f} ms  {args.authors / seconds:12,.0f} /s  x{baseline / seconds:.1f}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,157 @@
+"""
+Benchmark of the single-pass article extractor against the former `find()`-based one.
+
+Parses a synthetic PubmedArticleSet (see `pubmed_xml.py`) once, then times the extraction of the
+article details alone, and counts the elements each extractor visits per article. The results of
+both extractors are checked to be identical, except for the month of the publication dates which
+the former extractor always dropped.
+
+Usage:
+  poetry run python benchmarks/bench_extractor.py [--articles N] [--references N]
+"""
+import argparse
+import dataclasses
+import os
+import sys
+import tempfile
+import timeit
+import xml.etree.ElementTree
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pubmed_xml import ArticleProfile, write_article_set
+from pubmedfetcher.pubmed_fetcher.__init__ import _extract_email
+from pubmedfetcher.pubmed_fetcher.modules import PubmedArticleFetcher
+from pubmedfetcher.types import Article, Author
+
+class LegacyArticleFetcher(PubmedArticleFetcher):
+  """Former extractor: repeated `find()` calls, with `.//` descendant searches, per field."""
+  def _fetch_publicationDate(self, article_date):
+    year_text = article_date.find("./Year").text if article_date.find("./Year") is not None else ""
+    month_text = article_date.find("./Month").text if article_date.find("./Month") else ""
+    day_text = article_date.find("./Day").text if article_date.find("./Day") is not None else ""
+    if year_text and month_text and day_text:
+        return f"{day_text} {month_text} {year_text}"
+    elif year_text and month_text:
+        return f"{month_text} {year_text}"
+    elif year_text:
+        return year_text
+    else:
+        return ""
+
+  def _fetch_author_details(self, author):
+    affiliation = author.find("./AffiliationInfo/Affiliation")
+    affiliation_text = affiliation.text if affiliation is not None else ""
+    is_academic_affiliation = self.classifier.is_academic(affiliation_text)
+    if is_academic_affiliation:
+      return None, '', ''
+    author_forename = author.find("./ForeName")
+    author_lastname = author.find("./LastName")
+    author_forename_text = author_forename.text if author_forename is not None else ""
+    author_lastname_text = author_lastname.text if author_lastname is not None else ""
+    author_email = _extract_email(affiliation_text) if affiliation_text else ""
+    return Author(
+      name=f"{author_forename_text} {author_lastname_text}".strip(), affiliation=affiliation_text,
+      email=author_email, is_academic=is_academic_affiliation
+    ), affiliation_text, author_email
+
+  def _fetch_article_details(self, article):
+    pub_date = self._fetch_publicationDate(article.find(".//PubDate"))
+    date_revised = self._fetch_revisionDate(article.find("./MedlineCitation/DateRevised"))
+    pubmed_id = article.find(".//PMID").text if article.find(".//PMID") is not None else ""
+    article_title = article.find(".//ArticleTitle").text if article.find(".//ArticleTitle") is not None else ""
+    authors, company_affiliation, corresponding_email = [], [], None
+    for author in article.findall("./MedlineCitation/Article/AuthorList/Author"):
+      author, affiliation, email = self._fetch_author_details(author)
+      if author is None:
+        continue
+      authors.append(author)
+      if affiliation: company_affiliation.append(affiliation)
+      if not corresponding_email and email: corresponding_email = email
+    return Article(
+      pubmed_id=pubmed_id, title=article_title, publication_date=pub_date, non_academic_authors=tuple(authors),
+      company_affiliations=tuple(dict.fromkeys(company_affiliation)), corresponding_author_email=corresponding_email,
+      date_revised=date_revised
+    )
+
+def _descendant_visits(element, tag) -> int:
+  """Elements visited by `element.find('.//tag')`: the subtree is walked in document order up to the first match."""
+  for position, descendant in enumerate(element.iter()):
+    if descendant.tag == tag and descendant is not element:
+      return position + 1
+  return position + 1
+
+def _path_visits(element, path, find_all=False) -> int:
+  """Elements visited by `element.find('./a/b')`, or by `findall` which scans every child at each step."""
+  visits, context = 0, [element]
+  for tag in path.split('/'):
+    matches = []
+    for parent in context:
+      for child in parent:
+        visits += 1
+        if child.tag == tag:
+          matches.append(child)
+          if not find_all: break
+      if matches and not find_all: break
+    context = matches
+  return visits
+
+def legacy_visits(article) -> int:
+  """Elements visited by the former extractor: each `find()` walks the tree again, `.//` from the top of the article."""
+  visits = _descendant_visits(article, 'PubDate') + 2 * _descendant_visits(article, 'PMID') + 2 * _descendant_visits(article, 'ArticleTitle')
+  visits += _path_visits(article, 'MedlineCitation/DateRevised') + 3 * len(article.find('.//DateRevised'))
+  pub_date = article.find('.//PubDate')
+  visits += 5 * len(pub_date)
+  authors = article.findall('./MedlineCitation/Article/AuthorList/Author')
+  visits += _path_visits(article, 'MedlineCitation/Article/AuthorList/Author', find_all=True)
+  visits += sum(_path_visits(author, 'AffiliationInfo/Affiliation') + 2 * len(author) for author in authors)
+  return visits
+
+def single_pass_visits(article) -> int:
+  """Elements visited by the single-pass extractor: the children of each element on the path to the fields, once."""
+  citation = article.find('MedlineCitation')
+  journal_article = citation.find('Article')
+  journal_issue = journal_article.find('Journal/JournalIssue')
+  visits = len(article) + len(citation) + len(journal_article) + len(journal_article.find('Journal'))
+  visits += _path_visits(journal_issue, 'PubDate') + len(journal_issue.find('PubDate')) + 3 * len(citation.find('DateRevised'))
+  for author in journal_article.find('AuthorList'):
+    visits += 1 + len(author) + _path_visits(author, 'AffiliationInfo/Affiliation') - 1
+  return visits
+
+def main():
+  parser = argparse.ArgumentParser(description="Article extractor benchmark")
+  parser.add_argument('--articles', type=int, default=20_000, help="Number of articles. Default=20000.")
+  parser.add_argument('--references', type=int, default=30, help="Number of references of each article. Default=30.")
+  args = parser.parse_args()
+
+  with tempfile.TemporaryDirectory() as directory:
+    source = os.path.join(directory, 'articles.xml')
+    write_article_set(source, args.articles, ArticleProfile(references=args.references))
+    articles = xml.etree.ElementTree.parse(source).getroot().findall('PubmedArticle')
+
+  legacy, single_pass = LegacyArticleFetcher(), PubmedArticleFetcher()
+  for article in articles:
+    expected, actual = legacy._fetch_article_details(article), single_pass._fetch_article_details(article)
+    pub_date = article.find('.//PubDate')
+    # The former extractor dropped the month, and so only ever returned the year
+    assert expected.publication_date == pub_date.findtext('Year')
+    assert actual.publication_date.endswith(f"{pub_date.findtext('Month')} {pub_date.findtext('Year')}")
+    assert actual == dataclasses.replace(expected, publication_date=actual.publication_date), actual.pubmed_id
+
+  results = {}
+  for name, fetcher in (('find() per field', legacy), ('single pass', single_pass)):
+    seconds = min(timeit.repeat(lambda: [fetcher._fetch_article_details(article) for article in articles], number=1, repeat=3))
+    results[name] = seconds
+
+  visits = {
+    'find() per field': sum(map(legacy_visits, articles)) / len(articles),
+    'single pass': sum(map(single_pass_visits, articles)) / len(articles),
+  }
+  baseline = results['find() per field']
+  print(f"{len(articles)} articles, {args.references} references each, results identical")
+  for name, seconds in results.items():
+    print(f"  {name:<18} {seconds * 1000:8.1f} ms  {len(articles) / seconds:10,.0f} articles/s  x{baseline / seconds:.2f}  {visits[name]:6.1f} elements visited/article")
+
+if __name__ == "__main__":
+  main()
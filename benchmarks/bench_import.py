@@ -0,0 +1,76 @@
+"""
+Import-time benchmark of the `get-papers-list` entry point.
+
+Measures the time to import `pubmedfetcher.pubmed_fetcher.main` and to run `--help`, and checks that
+no heavy dependency is imported on the startup path. Exits with status 1 on a regression, so it can
+guard the fast-start path in CI.
+
+Usage:
+  poetry run python benchmarks/bench_import.py [--runs N] [--budget-ms MS]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_MODULE = 'pubmedfetcher.pubmed_fetcher.main'
+
+# Modules which must only be imported once the chosen mode needs them
+HEAVY_MODULES = (
+  'requests', 'urllib3', 'pandas', 'numpy', 'pyarrow', 'sqlite3', 'multiprocessing', 'concurrent.futures',
+  'xml.etree.ElementTree',
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')]))}
+
+def import_time_ms() -> float:
+  """Cumulative import time of the entry module, as reported by `python -X importtime`."""
+  result = subprocess.run(
+    [sys.executable, '-X', 'importtime', '-c', f'import {ENTRY_MODULE}'],
+    env=ENV, capture_output=True, text=True, check=True
+  )
+  for line in result.stderr.splitlines():
+    fields = [field.strip() for field in line.split('|')]
+    if len(fields) == 3 and fields[2] == ENTRY_MODULE:
+      return int(fields[1]) / 1000
+  raise RuntimeError(f"No import time reported for {ENTRY_MODULE}:\n{result.stderr}")
+
+def help_time_ms() -> float:
+  """Wall time of `get-papers-list --help`, including the interpreter startup."""
+  start = time.perf_counter()
+  subprocess.run([sys.executable, '-m', ENTRY_MODULE, '--help'], env=ENV, capture_output=True, check=True)
+  return (time.perf_counter() - start) * 1000
+
+def imported_heavy_modules() -> list:
+  code = f'import sys, {ENTRY_MODULE}; print(" ".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+  result = subprocess.run([sys.executable, '-c', code], env=ENV, capture_output=True, text=True, check=True)
+  return result.stdout.split()
+
+def main():
+  parser = argparse.ArgumentParser(description="get-papers-list import-time benchmark")
+  parser.add_argument('--runs', type=int, default=10, help="Number of measured runs. Default=10.")
+  parser.add_argument('--budget-ms', type=float, default=60, help="Maximum median import time in ms. Default=60.")
+  args = parser.parse_args()
+
+  imports = [import_time_ms() for _ in range(args.runs)]
+  helps = [help_time_ms() for _ in range(args.runs)]
+  heavy = imported_heavy_modules()
+
+  print(f"import {ENTRY_MODULE}: median {statistics.median(imports):.1f} ms, min {min(imports):.1f} ms")
+  print(f"get-papers-list --help:  median {statistics.median(helps):.1f} ms, min {min(helps):.1f} ms")
+  print(f"heavy modules imported at startup: {', '.join(heavy) or 'none'}")
+
+  failed = False
+  if statistics.median(imports) > args.budget_ms:
+    print(f"FAIL: median import time exceeds the {args.budget_ms:.0f} ms budget")
+    failed = True
+  if heavy:
+    print("FAIL: heavy modules must be imported lazily")
+    failed = True
+  sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+  main()
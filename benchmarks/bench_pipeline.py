@@ -0,0 +1,137 @@
+"""
+End-to-end throughput benchmark of the fetching and parsing pipeline.
+
+Each scenario runs in a fresh process against the local E-utilities stand-in (`eutils_server.py`),
+serving synthetic records generated by `pubmed_xml.py`, and reports the articles and requests per
+second, the peak RSS of the process, and the p50/p99 latency of the requests (time to the response
+headers, retries included as separate requests).
+
+Scenarios:
+  parse          Parse a generated PubmedArticleSet file, no network
+  fetch          Download every page of a search through the History Server, without parsing
+  end-to-end     Search, fetch, parse and write the results to CSV, as get-papers-list does
+  rate-limited   end-to-end against a server enforcing the NCBI limit of 10 requests/second
+  flaky          end-to-end with 50 ms latency and 5% of the requests failing with 5xx errors
+  ids            Fetch, parse and write an explicit PMID list (--ids) with 50 ms latency, prefetching the next batch
+  ids-serial     ids without prefetching, each batch is requested once the previous one is parsed
+
+Usage:
+  poetry run python benchmarks/bench_pipeline.py [SCENARIO ...] [--articles N] [--batch-size N] [--concurrency N]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from eutils_server import EutilsStandIn
+from pubmed_xml import write_article_set
+
+# Options of the stand-in server and client of each scenario
+SCENARIOS = {
+  'parse': {'network': False},
+  'fetch': {'network': True, 'parse': False},
+  'end-to-end': {'network': True, 'parse': True},
+  'rate-limited': {'network': True, 'parse': True, 'server': {'rate_limit': 10}, 'client_rate': 10},
+  'flaky': {'network': True, 'parse': True, 'server': {'latency': 0.05, 'error_rate': 0.05}},
+  'ids': {'network': True, 'parse': True, 'ids': True, 'prefetch': True, 'server': {'latency': 0.05}},
+  'ids-serial': {'network': True, 'parse': True, 'ids': True, 'prefetch': False, 'server': {'latency': 0.05}},
+}
+
+def _peak_rss_mib() -> float:
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # ru_maxrss is in KiB on Linux, in bytes on macOS
+  return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def _percentile(values, percent: float) -> float:
+  if not values:
+    return 0.0
+  values = sorted(values)
+  return values[min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))]
+
+def run_scenario(name: str, url: str, args) -> dict:
+  """Run a scenario in the current process and return its measurements."""
+  from pubmedfetcher.pubmed_fetcher.modules import EntrezQueries, PubmedArticleFetcher
+  from pubmedfetcher.pubmed_fetcher.ratelimit import RateLimiter
+  from pubmedfetcher.pubmed_fetcher.writers import open_writer
+
+  scenario = SCENARIOS[name]
+  fetcher = PubmedArticleFetcher()
+  latencies = []
+  articles = 0
+
+  with tempfile.TemporaryDirectory() as directory:
+    if not scenario['network']:
+      source = os.path.join(directory, 'articles.xml')
+      write_article_set(source, args.articles)
+      start = time.perf_counter()
+      for _ in fetcher._iter_article_details(source):
+        articles += 1
+      elapsed = time.perf_counter() - start
+    else:
+      # The client limit is only raised above the NCBI one to measure the pipeline itself
+      rate_limiter = RateLimiter(scenario.get('client_rate', 10_000))
+      start = time.perf_counter()
+      with EntrezQueries(
+        base_url=url, rate_limiter=rate_limiter, pool_size=max(10, args.concurrency), retries=5, backoff_factor=0.1
+      ) as entrez, open_writer('csv', os.path.join(directory, 'results.csv')) as writer:
+        entrez.session.hooks['response'].append(lambda response, *_, **__: latencies.append(response.elapsed.total_seconds()))
+        if scenario.get('ids'):
+          pages = entrez.entrezFetchIds(
+            (str(pmid) for pmid in range(1, args.articles + 1)), db='pubmed', batch_size=args.batch_size,
+            rettype='xml', retmode='text', stream=True, concurrency=args.concurrency, prefetch=scenario['prefetch']
+          )
+        else:
+          pages = entrez.entrezFetchPages(
+            db='pubmed', term='benchmark', batch_size=args.batch_size, max_records=args.articles,
+            rettype='xml', retmode='text', stream=True, concurrency=args.concurrency
+          )
+        for page in pages:
+          if not scenario['parse']:
+            while page.read(1 << 16):
+              pass
+            articles += args.batch_size
+            continue
+          for article in fetcher._iter_article_details(page):
+            articles += 1
+            if article.non_academic_authors:
+              writer.write(article.to_row())
+      elapsed = time.perf_counter() - start
+
+  return {
+    'articles': min(articles, args.articles), 'seconds': elapsed, 'requests': len(latencies), 'peak_rss_mib': _peak_rss_mib(),
+    'p50_ms': _percentile(latencies, 50) * 1000, 'p99_ms': _percentile(latencies, 99) * 1000,
+  }
+
+def main():
+  parser = argparse.ArgumentParser(description="get-papers-list pipeline benchmark")
+  parser.add_argument('scenarios', nargs='*', metavar='SCENARIO', help=f"Scenarios to run: {', '.join(SCENARIOS)}. Default=all.")
+  parser.add_argument('--articles', type=int, default=5_000, help="Number of articles per scenario. Default=5000.")
+  parser.add_argument('--batch-size', type=int, default=500, help="Number of articles per efetch request. Default=500.")
+  parser.add_argument('--concurrency', type=int, default=1, help="Number of pages fetched in parallel. Default=1.")
+  args = parser.parse_args()
+  unknown = set(args.scenarios).difference(SCENARIOS)
+  if unknown:
+    parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+  print(f"{'scenario':<14}{'articles/s':>12}{'requests/s':>12}{'requests':>10}{'p50 ms':>9}{'p99 ms':>9}{'peak RSS MiB':>14}  server responses")
+  for name in args.scenarios or SCENARIOS:
+    with EutilsStandIn(articles=args.articles, **SCENARIOS[name].get('server', {})) as server:
+      # A fresh process per scenario, so the peak RSS of a scenario is not inherited by the next ones
+      with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        result = executor.submit(run_scenario, name, server.url, args).result()
+      responses = ', '.join(f"{status}: {count}" for status, count in sorted(server.statuses.items())) or '-'
+
+    print(
+      f"{name:<14}{result['articles'] / result['seconds']:>12.0f}{result['requests'] / result['seconds']:>12.1f}"
+      f"{result['requests']:>10}{result['p50_ms']:>9.1f}{result['p99_ms']:>9.1f}{result['peak_rss_mib']:>14.1f}  {responses}"
+    )
+
+if __name__ == "__main__":
+  main()
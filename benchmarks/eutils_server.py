@@ -0,0 +1,229 @@
+"""
+Local stand-in for the NCBI E-utilities, for the benchmarks.
+
+Serves `einfo`, `esearch`, `efetch` and `esummary` over a synthetic database of consecutive PMIDs,
+whose records are generated on demand by `pubmed_xml.py`. The latency of the responses, a request
+rate limit answered with 429 like NCBI's, and random 5xx errors can be configured to benchmark the
+client under realistic or adverse conditions.
+
+Usage:
+  poetry run python benchmarks/eutils_server.py [--port PORT] [--articles N] [--latency S] [--rate-limit R] [--error-rate F]
+"""
+import argparse
+import gzip
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from pubmed_xml import ArticleProfile, iter_article_set
+
+WEBENV = 'MCID_BENCHMARK'
+QUERY_KEY = '1'
+
+class _Server(ThreadingHTTPServer):
+  daemon_threads = True
+
+  def handle_error(self, request, client_address):
+    # Clients closing their pooled keep-alive connections are not errors
+    if not isinstance(sys.exc_info()[1], ConnectionError):
+      super().handle_error(request, client_address)
+
+class EutilsStandIn:
+  """
+  E-utilities stand-in server, running on a background thread.
+
+  Every search matches the whole database of `articles` records, with PMIDs from `first_pmid`.
+  The server is a context manager: it is started on enter and stopped on exit.
+  """
+  def __init__(self, articles: int = 10_000, latency: float = 0.0, jitter: float = 0.0, rate_limit: Optional[float] = None,
+               error_rate: float = 0.0, profile: ArticleProfile = ArticleProfile(), seed: int = 0, first_pmid: int = 1,
+               host: str = '127.0.0.1', port: int = 0):
+    """
+    Args:
+      articles (int): Number of records of the database. Default: 10000
+      latency (float): Delay in seconds added to every response. Default: 0
+      jitter (float): Maximum random delay in seconds added to `latency`. Default: 0
+      rate_limit (float, optional): Requests per second accepted in any one-second window, the
+        others are answered with 429 Too Many Requests. Default: None, unlimited
+      error_rate (float): Fraction of the requests answered with a random 500, 502 or 503 error. Default: 0
+      profile (ArticleProfile): Distributions of the generated records. Default: ArticleProfile()
+      seed (int): Seed of the records and of the injected errors. Default: 0
+      first_pmid (int): PMID of the first record. Default: 1
+      host (str): Address the server listens on. Default: 127.0.0.1
+      port (int): Port the server listens on. Default: 0, any free port
+    """
+    self.articles = articles
+    self.latency = latency
+    self.jitter = jitter
+    self.rate_limit = rate_limit
+    self.error_rate = error_rate
+    self.profile = profile
+    self.seed = seed
+    self.first_pmid = first_pmid
+    # Number of responses sent, by status
+    self.statuses = Counter()
+
+    self._rng = random.Random(seed)
+    self._lock = threading.Lock()
+    self._recent = deque()
+    self._server = _Server((host, port), self._handler_class())
+    self._thread = None
+
+  @property
+  def url(self) -> str:
+    """Base URL of the E-utilities, to pass as `EntrezQueries(base_url=...)`."""
+    host, port = self._server.server_address[:2]
+    return f'http://{host}:{port}/entrez/eutils'
+
+  def start(self) -> "EutilsStandIn":
+    self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self) -> None:
+    self._server.shutdown()
+    self._server.server_close()
+
+  def __enter__(self):
+    return self.start()
+
+  def __exit__(self, *exc_info):
+    self.stop()
+
+  def _admit(self) -> Optional[int]:
+    """Apply the rate limit and the error injection. Returns the error status of the request, or None."""
+    with self._lock:
+      if self.rate_limit:
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] >= 1:
+          self._recent.popleft()
+        if len(self._recent) >= self.rate_limit:
+          return 429
+        self._recent.append(now)
+      if self.error_rate and self._rng.random() < self.error_rate:
+        return self._rng.choice((500, 502, 503))
+    return None
+
+  def _pmids(self, params: Dict[str, str]) -> List[int]:
+    """PMIDs selected by the `id` parameter, or by `retstart`/`retmax` within the search results."""
+    if 'id' in params:
+      return [int(pmid) for pmid in params['id'].split(',') if pmid.strip()]
+    start = int(params.get('retstart', 0))
+    end = min(self.articles, start + int(params.get('retmax', 20)))
+    return list(range(self.first_pmid + start, self.first_pmid + max(start, end)))
+
+  def _esearch(self, params: Dict[str, str]) -> bytes:
+    # Like PubMed, esearch only gives access to the first 10,000 results
+    if int(params.get('retstart', 0)) >= 10_000:
+      return (
+        b'<?xml version="1.0" encoding="UTF-8" ?>\n<eSearchResult><ERROR>Search Backend failed: '
+        b'retstart cannot be larger than 9998</ERROR></eSearchResult>'
+      )
+    ids = ''.join(f'<Id>{pmid}</Id>' for pmid in self._pmids(params))
+    history = f'<QueryKey>{QUERY_KEY}</QueryKey><WebEnv>{WEBENV}</WebEnv>' if params.get('usehistory') == 'y' else ''
+    return (
+      f'<?xml version="1.0" encoding="UTF-8" ?>\n<eSearchResult><Count>{self.articles}</Count>'
+      f'<RetMax>{params.get("retmax", 20)}</RetMax><RetStart>{params.get("retstart", 0)}</RetStart>'
+      f'{history}<IdList>{ids}</IdList></eSearchResult>'
+    ).encode()
+
+  def _efetch(self, params: Dict[str, str]) -> bytes:
+    if params.get('rettype') == 'uilist':
+      return ''.join(f'{pmid}\n' for pmid in self._pmids(params)).encode()
+    return b''.join(iter_article_set(self._pmids(params), self.profile, self.seed))
+
+  def _esummary(self, params: Dict[str, str]) -> bytes:
+    pmids = self._pmids(params)
+    result = {'uids': [str(pmid) for pmid in pmids]}
+    for pmid in pmids:
+      rng = random.Random(self.seed * 1_000_003 + pmid)
+      year = rng.randint(1990, 2025)
+      result[str(pmid)] = {
+        'uid': str(pmid), 'pubdate': f'{year} Jan', 'sortpubdate': f'{year}/01/01 00:00',
+        'source': f'J Synth Res {pmid % 50}', 'fulljournalname': f'Journal of Synthetic Research {pmid % 50}',
+        'pubtype': ['Review'] if pmid % 5 == 0 else ['Journal Article'],
+      }
+    return json.dumps({'header': {'type': 'esummary', 'version': '0.3'}, 'result': result}).encode()
+
+  def _handler_class(self):
+    stand_in = self
+
+    class Handler(BaseHTTPRequestHandler):
+      protocol_version = 'HTTP/1.1'
+
+      def log_message(self, *args):
+        pass
+
+      def _reply(self, status: int, body: bytes, content_type: str, headers: Dict[str, str] = {}) -> None:
+        if 'gzip' in self.headers.get('Accept-Encoding', '') and len(body) > 1024:
+          body = gzip.compress(body, compresslevel=1)
+          headers = {**headers, 'Content-Encoding': 'gzip'}
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+          self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with stand_in._lock:
+          stand_in.statuses[status] += 1
+
+      def _handle(self, query: str) -> None:
+        if stand_in.latency or stand_in.jitter:
+          time.sleep(stand_in.latency + random.uniform(0, stand_in.jitter))
+
+        error = stand_in._admit()
+        if error == 429:
+          return self._reply(429, b'{"error":"API rate limit exceeded"}', 'application/json', {'Retry-After': '1'})
+        if error is not None:
+          return self._reply(error, b'<html><body>Service unavailable</body></html>', 'text/html')
+
+        params = {name: values[0] for name, values in parse_qs(query).items()}
+        endpoint = urlsplit(self.path).path.rsplit('/', 1)[-1].split('.')[0]
+        if endpoint == 'esearch':
+          self._reply(200, stand_in._esearch(params), 'text/xml; charset=UTF-8')
+        elif endpoint == 'efetch':
+          content_type = 'text/plain' if params.get('rettype') == 'uilist' else 'text/xml'
+          self._reply(200, stand_in._efetch(params), f'{content_type}; charset=UTF-8')
+        elif endpoint == 'esummary':
+          self._reply(200, stand_in._esummary(params), 'application/json; charset=UTF-8')
+        elif endpoint == 'einfo':
+          self._reply(200, b'<?xml version="1.0" ?>\n<eInfoResult><DbList><DbName>pubmed</DbName></DbList></eInfoResult>', 'text/xml')
+        else:
+          self._reply(404, b'Not Found', 'text/plain')
+
+      def do_GET(self):
+        self._handle(urlsplit(self.path).query)
+
+      def do_POST(self):
+        self._handle(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode())
+
+    return Handler
+
+def main():
+  parser = argparse.ArgumentParser(description="Local NCBI E-utilities stand-in server")
+  parser.add_argument('--port', type=int, default=8765, help="Port to listen on. Default=8765.")
+  parser.add_argument('--articles', type=int, default=10_000, help="Number of records of the database. Default=10000.")
+  parser.add_argument('--latency', type=float, default=0.0, help="Delay in seconds of every response. Default=0.")
+  parser.add_argument('--jitter', type=float, default=0.0, help="Maximum random delay in seconds added to the latency. Default=0.")
+  parser.add_argument('--rate-limit', type=float, default=None, help="Requests per second accepted before answering 429. Default=unlimited.")
+  parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of the requests failing with a 5xx error. Default=0.")
+  args = parser.parse_args()
+
+  with EutilsStandIn(
+    args.articles, args.latency, args.jitter, args.rate_limit, args.error_rate, port=args.port
+  ) as server:
+    print(f"Serving the E-utilities on {server.url}, press Ctrl+C to stop.")
+    try:
+      threading.Event().wait()
+    except KeyboardInterrupt:
+      pass
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,154 @@
+"""
+Generator of synthetic PubmedArticleSet documents, for the benchmarks.
+
+Articles follow the structure of real efetch results (see `test_data.xml`) and are generated
+deterministically from their PMID and the seed, so the stand-in server and the benchmarks can
+produce the same article again without keeping it in memory.
+
+Usage:
+  poetry run python benchmarks/pubmed_xml.py OUTPUT.xml [--articles N] [--authors MIN MAX] [--company-fraction F]
+"""
+import argparse
+import random
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Tuple
+from xml.sax.saxutils import escape
+
+ACADEMIC_AFFILIATIONS = (
+  "Department of Neurology, Harvard Medical School, Boston, MA, USA.",
+  "Faculty of Medicine, University of Oxford, Oxford, UK.",
+  "School of Pharmacy, Fudan University, Shanghai, China.",
+  "Center for RNA Research, Institute for Basic Science, Seoul, Republic of Korea.",
+  "Plant Stress Biology Group, International Centre for Genetic Engineering and Biotechnology, New Delhi, India.",
+  "Institute of Molecular Biology, Academia Sinica, Taipei, Taiwan.",
+)
+
+COMPANY_AFFILIATIONS = (
+  "Eisai Inc., Nutley, NJ, USA.",
+  "Pfizer Worldwide Research and Development, Groton, CT, USA.",
+  "Genentech, Inc., South San Francisco, CA, USA.",
+  "Novartis Institutes for BioMedical Research, Basel, Switzerland.",
+  "Roche Pharma Research and Early Development, F. Hoffmann-La Roche Ltd, Basel, Switzerland.",
+  "AstraZeneca plc, Cambridge, UK.",
+)
+
+FORENAMES = ("Brian A", "Pratik", "Natasha", "Arnaud", "Larisa", "Mei", "Olusegun", "Ines", "Rahul", "Sofia")
+LASTNAMES = ("Willis", "Bhagunde", "Penner", "Charil", "Reyderman", "Chen", "Adeyemi", "Garcia", "Rai", "Rossi")
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+WORDS = (
+  "lecanemab", "amyloid", "clinical", "efficacy", "dosing", "regimen", "antibody", "model", "patients",
+  "treatment", "phase", "study", "exposure", "response", "cohort", "analysis", "protein", "expression",
+)
+
+@dataclass(frozen=True)
+class ArticleProfile:
+  """Distributions of the generated articles."""
+  # Inclusive range of the number of authors of an article
+  authors: Tuple[int, int] = (1, 12)
+  # Fraction of the authors affiliated with a company
+  company_fraction: float = 0.2
+  # Fraction of the company affiliations ending with an email address
+  email_fraction: float = 0.3
+  # Inclusive range of the number of affiliations of an author
+  affiliations: Tuple[int, int] = (1, 2)
+  # Number of words of the abstract, which makes up most of the size of real records
+  abstract_words: int = 250
+  # Number of MeSH headings and of cited references
+  mesh_headings: int = 10
+  references: int = 30
+
+def generate_article(pmid: int, profile: ArticleProfile = ArticleProfile(), seed: int = 0) -> str:
+  """
+  Args:
+    pmid (int): PMID of the article.
+    profile (ArticleProfile): Distributions of the article. Default: ArticleProfile()
+    seed (int): Seed of the generator, the same PMID and seed always give the same article. Default: 0
+
+  Returns:
+    str: XML of the `<PubmedArticle>` element
+  """
+  rng = random.Random(seed * 1_000_003 + pmid)
+  authors = []
+  for _ in range(rng.randint(*profile.authors)):
+    affiliations = []
+    for _ in range(rng.randint(*profile.affiliations)):
+      if rng.random() < profile.company_fraction:
+        affiliation = rng.choice(COMPANY_AFFILIATIONS)
+        if rng.random() < profile.email_fraction:
+          affiliation += f" Electronic address: author{pmid}.{len(authors)}@example.com."
+      else:
+        affiliation = rng.choice(ACADEMIC_AFFILIATIONS)
+      affiliations.append(f"<AffiliationInfo><Affiliation>{escape(affiliation)}</Affiliation></AffiliationInfo>")
+    forename, lastname = rng.choice(FORENAMES), rng.choice(LASTNAMES)
+    authors.append(
+      f'<Author ValidYN="Y"><LastName>{lastname}</LastName><ForeName>{forename}</ForeName>'
+      f'<Initials>{forename[0]}</Initials>{"".join(affiliations)}</Author>'
+    )
+
+  title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))).capitalize()
+  abstract = " ".join(rng.choice(WORDS) for _ in range(profile.abstract_words))
+  mesh = "".join(
+    f'<MeshHeading><DescriptorName UI="D{rng.randint(0, 999999):06d}" MajorTopicYN="N">{rng.choice(WORDS).capitalize()}</DescriptorName></MeshHeading>'
+    for _ in range(profile.mesh_headings)
+  )
+  references = "".join(
+    f'<Reference><Citation>{rng.choice(LASTNAMES)} et al. {rng.choice(WORDS).capitalize()}. J Synth Res. {rng.randint(1950, 2024)}.</Citation>'
+    f'<ArticleIdList><ArticleId IdType="pubmed">{rng.randint(1, 39_000_000)}</ArticleId></ArticleIdList></Reference>'
+    for _ in range(profile.references)
+  )
+  year, month, day = rng.randint(1990, 2025), rng.randint(1, 12), rng.randint(1, 28)
+  # A third of the real records only give the year and month of publication
+  day_element = f"<Day>{day:02d}</Day>" if rng.random() < 0.66 else ""
+  return (
+    '<PubmedArticle><MedlineCitation Status="MEDLINE" Owner="NLM">'
+    f'<PMID Version="1">{pmid}</PMID>'
+    f'<DateRevised><Year>{min(year + 1, 2025)}</Year><Month>{month:02d}</Month><Day>{day:02d}</Day></DateRevised>'
+    '<Article PubModel="Print"><Journal><JournalIssue CitedMedium="Internet">'
+    f'<PubDate><Year>{year}</Year><Month>{MONTHS[month - 1]}</Month>{day_element}</PubDate>'
+    f'</JournalIssue><Title>Journal of Synthetic Research {pmid % 50}</Title></Journal>'
+    f'<ArticleTitle>{title}.</ArticleTitle>'
+    f'<Abstract><AbstractText>{abstract}.</AbstractText></Abstract>'
+    f'<AuthorList CompleteYN="Y">{"".join(authors)}</AuthorList>'
+    '<PublicationTypeList><PublicationType UI="D016428">Journal Article</PublicationType></PublicationTypeList>'
+    f'</Article><MeshHeadingList>{mesh}</MeshHeadingList></MedlineCitation>'
+    f'<PubmedData><PublicationStatus>ppublish</PublicationStatus><ReferenceList>{references}</ReferenceList></PubmedData></PubmedArticle>'
+  )
+
+def iter_article_set(pmids: Iterable[int], profile: ArticleProfile = ArticleProfile(), seed: int = 0) -> Iterator[bytes]:
+  """
+  Generate a PubmedArticleSet document piece by piece, so documents of any size can be streamed.
+
+  Args:
+    pmids (iterable of int): PMIDs of the articles, in order.
+    profile (ArticleProfile): Distributions of the articles. Default: ArticleProfile()
+    seed (int): Seed of the generator. Default: 0
+
+  Yields:
+    bytes: UTF-8 encoded parts of the document
+  """
+  yield b'<?xml version="1.0" ?>\n<PubmedArticleSet>\n'
+  for pmid in pmids:
+    yield generate_article(pmid, profile, seed).encode()
+    yield b'\n'
+  yield b'</PubmedArticleSet>\n'
+
+def write_article_set(path: str, articles: int, profile: ArticleProfile = ArticleProfile(), seed: int = 0, first_pmid: int = 1) -> None:
+  """Write a PubmedArticleSet of `articles` articles, with consecutive PMIDs from `first_pmid`, to `path`."""
+  with open(path, 'wb') as file:
+    file.writelines(iter_article_set(range(first_pmid, first_pmid + articles), profile, seed))
+
+def main():
+  parser = argparse.ArgumentParser(description="Synthetic PubmedArticleSet generator")
+  parser.add_argument('output', help="Output XML file.")
+  parser.add_argument('--articles', type=int, default=10_000, help="Number of articles. Default=10000.")
+  parser.add_argument('--authors', type=int, nargs=2, default=(1, 12), metavar=('MIN', 'MAX'), help="Range of the number of authors per article. Default=1 12.")
+  parser.add_argument('--company-fraction', type=float, default=0.2, help="Fraction of the authors affiliated with a company. Default=0.2.")
+  parser.add_argument('--abstract-words', type=int, default=250, help="Number of words of each abstract. Default=250.")
+  parser.add_argument('--seed', type=int, default=0, help="Seed of the generator. Default=0.")
+  args = parser.parse_args()
+
+  profile = ArticleProfile(authors=tuple(args.authors), company_fraction=args.company_fraction, abstract_words=args.abstract_words)
+  write_article_set(args.output, args.articles, profile, args.seed)
+
+if __name__ == "__main__":
+  main()
@@ -1,7 +1,18 @@
+import io
 import re
+import time
+import random
 import logging
-import requests
 from urllib.parse import urlencode
+from pubmedfetcher.pubmed_fetcher.metrics import NULL_METRICS
+
+# `requests`, `xml.etree` and the affiliation classifier are imported by the helpers using them, 
+# so that importing the package (e.g. for `get-papers-list --help`) stays fast.
+
+# Transient HTTP statuses returned by the E-utilities under load, worth retrying
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+logger = logging.getLogger(__name__)
 
 def setup_logging(debug: bool) -> None:
   """Configure logging based on debug flag."""
@@ -15,23 +26,16 @@ def _is_academic_affiliation(affiliation):
   """
   Check if a given affiliation string indicates an academic institution.
 
+  Uses the default keywords of `AffiliationClassifier`, see `classifier.py`.
+
   Args:
     affiliation (str): The affiliation string to check. Can be None or empty.
 
   Returns:
     bool: True if the affiliation appears to be academic, False otherwise.
   """
-  # Return False if affiliation is empty/None
-  if not affiliation:
-    return False
-  
-  academic_keywords = {'university', 'lab', '.edu.' 'college', 'school of', 'institute of', 'academic', 'academia', 'faculty of'}
-  
-  for keyword in academic_keywords:
-    # Check if affiliation contains any academic-related keywords 
-    if keyword in affiliation.lower():
-      return True
-  return False
+  from pubmedfetcher.pubmed_fetcher.classifier import default_classifier
+  return default_classifier.is_academic(affiliation)
 
 def _extract_email(text):
   email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
@@ -92,7 +96,99 @@ def _format_ids(ids):
   # Convert iterable to comma-separated string
   return ",".join(map(str, ids))
 
-def _request(url, payloads=None, post=None, ecitmatch=False, join_ids=True):
+def _create_session(pool_size=10, gzip=True):
+  """
+  Create an HTTP session keeping connections to the E-utilities alive between requests.
+
+  Args:
+    pool_size (int): Maximum number of connections kept open per host. Should be at least 
+        the number of threads sharing the session. Default: 10
+    gzip (bool): If True, ask for gzip compressed responses. Default: True
+
+  Returns:
+    requests.Session: Session with a connection pool of `pool_size` connections.
+  """
+  import requests
+
+  session = requests.Session()
+  adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+  session.mount('https://', adapter)
+  session.mount('http://', adapter)
+  session.headers['Accept-Encoding'] = 'gzip, deflate' if gzip else 'identity'
+  return session
+
+def _retry_delay(response, attempt, backoff_factor, max_delay=60.0):
+  """
+  Compute how long to wait before retrying a failed request.
+
+  Honors the `Retry-After` header of the response when present (either a number of seconds 
+  or an HTTP date). Otherwise uses exponential backoff with full jitter: a random delay between
+  0 and `backoff_factor * 2 ** attempt` seconds.
+
+  Args:
+    response (requests.Response, aiohttp.ClientResponse or None): The failed response, None if no response was received.
+    attempt (int): Number of the failed attempt, starting from 0.
+    backoff_factor (float): Base delay in seconds of the exponential backoff.
+    max_delay (float): Upper bound of the delay in seconds. Default: 60
+
+  Returns:
+    float: Delay in seconds.
+  """
+  retry_after = response.headers.get('Retry-After') if response is not None else None
+  if retry_after:
+    try:
+      delay = float(retry_after)
+    except ValueError:
+      try:
+        from email.utils import parsedate_to_datetime
+        delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+      except (TypeError, ValueError):
+        delay = None
+    if delay is not None:
+      return min(max(delay, 0.0), max_delay)
+
+  return random.uniform(0, min(max_delay, backoff_factor * 2 ** attempt))
+
+def _cached_response(url, body):
+  """
+  Build a successful `requests.Response` from a cached response body.
+
+  The body is available both as `content`/`text` and as a file-like `raw` object, 
+  so the response can be consumed the same way as a streamed one.
+  """
+  import requests
+
+  response = requests.Response()
+  response.status_code = 200
+  response.url = url
+  response.encoding = 'utf-8'
+  response._content = body
+  response.raw = io.BytesIO(body)
+  return response
+
+def _encode_params(payloads, post=None, ecitmatch=False, join_ids=True):
+  """
+  URL-encode the parameters of an E-utility request and choose its HTTP method, see `_request`.
+
+  Returns:
+    tuple: The parameters dict, their URL-encoded string, and whether to send them with POST.
+  """
+  # Process and Convert parameters in the form of a URL-encoded string
+  params = _contruct_params(payloads, join_ids)
+  params_str = urlencode(params, doseq=True)
+
+  # Preserve URL-encoding for pipe ("|") characters, required by the ecitmatch tool.
+  if ecitmatch: params_str = params_str.replace("%7C", "|")
+
+  # Determine request method based on size and ID count
+  if post is None:
+    if len(params_str) >= 1000: post = True # Switch to POST if parameters are too long
+    elif 'id' in params and (params['id'].count(',') + 1) >= 200: post = True # Switch to POST if too many IDs
+
+  return params, params_str, bool(post)
+
+def _request(url, payloads=None, post=None, ecitmatch=False, join_ids=True, stream=False, rate_limiter=None,
+             session=None, timeout=None, retries=0, backoff_factor=0.5, cache=None, metrics=None):
   """
   Build an HTTP request object for accessing an E-utility service based on 
   the size of the URL-encoded parameters or the `post` flag.
@@ -109,26 +205,173 @@ def _request(url, payloads=None, post=None, ecitmatch=False, join_ids=True):
     ecitmatch (bool): If True, preserves pipe characters in URL encoding for the ecitmatch tool. Default: False
     joins_ids (bool): Join certain IDs within the `payloads` before URL encoding. This flag is passed to a 
         helper function like `_construct_params`, which processes the parameters accordingly. Default: True
+    stream (bool): If True, the response body is not downloaded up front and can be consumed 
+        incrementally through `response.raw`. Default: False
+    rate_limiter (RateLimiter, optional): Limiter shared by every request sent to the E-utilities. 
+        A token is acquired from it before each attempt is sent. Default: None, no rate limiting
+    session (requests.Session, optional): Session used to send the request, reusing its pooled 
+        connections. Default: None, a new connection is opened for the request
+    timeout (float or tuple, optional): Connect and read timeout in seconds, see `requests.request`. 
+        Default: None, wait forever
+    retries (int): Number of times the request is retried after a connection error, a timeout or
+        a transient error status (429, 5xx). Default: 0
+    backoff_factor (float): Base delay in seconds between retries, see `_retry_delay`. Default: 0.5
+    cache (ResponseCache, optional): Cache of response bodies. A cached response is returned without 
+        sending any request, and successful responses are stored in the cache, unless they report an
+        E-utilities ERROR. A streamed response is downloaded in full before being stored. Default: None, no caching
+    metrics (Metrics, optional): Metrics recording the status, attempts, size and latency of the request, 
+        and the time spent waiting for the rate limiter and the network. Default: None, not recorded
 
   Returns:
     requests.Response: A `requests.Response` object resulting from the HTTP request. 
+      The response of the last attempt is returned if every retry failed with an error status.
   """
-  # Process and Convert parameters in the form of a URL-encoded string
-  params = _contruct_params(payloads, join_ids)
-  params_str = urlencode(params, doseq=True)
+  import requests
 
-  # Preserve URL-encoding for pipe ("|") characters, required by the ecitmatch tool.
-  if ecitmatch: params_str = params_str.replace("%7C", "|")
+  params, params_str, post = _encode_params(payloads, post, ecitmatch, join_ids)
 
-  # Determine request method based on size and ID count
-  if post is None:
-    if len(params_str) >= 1000: post = True # Switch to POST if parameters are too long
-    elif 'id' in params and (params['id'].count(',') + 1) >= 200: post = True # Switch to POST if too many IDs
+  metrics = metrics if metrics is not None else NULL_METRICS
+  endpoint = url.rsplit('/', 1)[-1].split('.')[0]
+
+  if cache is not None:
+    body = cache.get(url, params)
+    if body is not None:
+      metrics.record_request(endpoint, 200, 1, 0.0, 0 if stream else len(body), cached=True)
+      return _cached_response(url, body)
+
+  with metrics.timer('network'):
+    response = _send_request(
+      client=session if session is not None else requests, url=url, params_str=params_str, post=post, stream=stream, 
+      rate_limiter=rate_limiter, timeout=timeout, retries=retries, backoff_factor=backoff_factor, metrics=metrics, endpoint=endpoint
+    )
+
+    if cache is not None and response.status_code == 200:
+      # Reading `content` downloads and decodes the whole body, even for a streamed response
+      body = response.content
+      # Errors reported in a successful response, e.g. of an expired WebEnv, are not cached
+      if b'<ERROR>' not in body:
+        cache.set(url, params, body)
+      if stream: response.raw = io.BytesIO(body)
 
-  return (
-    requests.get(f'{url}?{params_str}') if post is None else requests.post(url, data=params_str.encode('utf8'))
+  return response
+
+def _send_request(client, url, params_str, post, stream, rate_limiter, timeout, retries, backoff_factor, metrics, endpoint):
+  """Send a request with `client`, retrying it on failure, see `_request`."""
+  import requests
+
+  start = time.perf_counter()
+  waited = 0.0
+  for attempt in range(retries + 1):
+    # Wait for our turn to stay within the NCBI request limits
+    if rate_limiter is not None:
+      wait_start = time.perf_counter()
+      with metrics.timer('rate_limit'):
+        rate_limiter.acquire()
+      waited += time.perf_counter() - wait_start
+
+    try:
+      response = (
+        client.post(url, data=params_str.encode('utf8'), stream=stream, timeout=timeout) if post
+        else client.get(f'{url}?{params_str}', stream=stream, timeout=timeout)
+      )
+    except (requests.ConnectionError, requests.Timeout) as e:
+      if attempt == retries: raise
+      delay = _retry_delay(None, attempt, backoff_factor)
+      logger.debug(f"Request to {url} failed ({e}), retrying in {delay:.2f}s.")
+    else:
+      if response.status_code not in RETRY_STATUSES or attempt == retries:
+        break
+      delay = _retry_delay(response, attempt, backoff_factor)
+      logger.debug(f"Request to {url} returned {response.status_code}, retrying in {delay:.2f}s.")
+      # Release the connection back to the pool before waiting
+      response.close()
+
+    time.sleep(delay)
+
+  # Streamed bodies are counted as they are read, see `Metrics.meter`
+  metrics.record_request(
+    endpoint, response.status_code, attempt + 1, time.perf_counter() - start - waited, 0 if stream else len(response.content)
   )
+  return response
+
+def _parse_esearch_result(text):
+  """
+  Extract the result count, Entrez History Server keys and UIDs from an ESearch XML response.
+
+  Args:
+    text (str): XML response returned by the esearch E-utility.
+
+  Returns:
+    dict: Dictionary containing the following keys:
+      - count (int): Total number of records matching the query
+      - webenv (str): Web environment string, or None if usehistory was not requested
+      - query_key (str): Query key of the search on the History Server, or None if usehistory was not requested
+      - ids (list): UIDs included in the response
+  
+  Raises:
+    ValueError: If the response is not an eSearchResult document.
+  """
+  import xml.etree.ElementTree as ET
+
+  root = ET.fromstring(text)
+  if root.tag != 'eSearchResult':
+    raise ValueError("Invalid Search Response.")
+
+  # esearch reports query errors inside the result document instead of as an HTTP error
+  error = root.find("./ERROR")
+  if error is not None:
+    raise ValueError(f"Search Error: {error.text}")
+
+  count = root.find("./Count")
+  return {
+    'count': int(count.text) if count is not None else 0,
+    'webenv': root.findtext("./WebEnv"),
+    'query_key': root.findtext("./QueryKey"),
+    'ids': [id.text for id in root.findall("./IdList/Id")],
+  }
+
+def _parse_esummary_result(text):
+  """
+  Extract the document summaries (DocSums) from an ESummary JSON response (`retmode=json`).
+
+  Args:
+    text (str): JSON response returned by the esummary E-utility.
+
+  Returns:
+    list: DocSum of each record, as a dict (e.g. uid, pubdate, pubtype, fulljournalname), in the order of the response.
+
+  Raises:
+    ValueError: If the response reports an error, or has no result.
+  """
+  import json
+
+  document = json.loads(text)
+  # esummary reports errors inside the result document instead of as an HTTP error
+  if 'error' in document:
+    raise ValueError(f"Summary Error: {document['error']}")
+  result = document.get('result')
+  if result is None:
+    raise ValueError("Invalid Summary Response.")
+  return [result[uid] for uid in result.get('uids', []) if uid in result]
+
+def _fetch_error(root):
+  """
+  Build the error of an efetch response which is not a PubmedArticleSet.
+
+  efetch reports some errors, e.g. an unknown WebEnv or query_key, in an `<eFetchResult>` document
+  with a successful status instead of as an HTTP error.
+
+  Args:
+    root (xml.etree.ElementTree.Element): Root element of the response, parsed in full.
+
+  Returns:
+    ValueError: The error to raise, with the message of the ERROR element if there is one.
+  """
+  error = root.findtext('.//ERROR')
+  return ValueError(f"Fetch Error: {error.strip()}" if error else f"Invalid Fetch Response: <{root.tag}> document.")
 
 __all__ = [
-  _is_academic_affiliation, _extract_email, _contruct_params, _format_ids, _request
+  _is_academic_affiliation, _extract_email, _contruct_params, _format_ids, _create_session, _retry_delay, 
+  _cached_response, _encode_params, _request, _send_request, _parse_esearch_result, _parse_esummary_result,
+  _fetch_error
 ]
\ No newline at end of file
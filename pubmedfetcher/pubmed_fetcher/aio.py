@@ -0,0 +1,228 @@
+import asyncio
+import io
+import logging
+from collections import deque
+from typing import AsyncIterator, List
+
+from pubmedfetcher.pubmed_fetcher.__init__ import RETRY_STATUSES, _encode_params, _retry_delay, _parse_esearch_result
+from pubmedfetcher.pubmed_fetcher.metrics import NULL_METRICS
+from pubmedfetcher.pubmed_fetcher.modules import EUTILS_URL, PubmedArticleFetcher
+from pubmedfetcher.pubmed_fetcher.ratelimit import AsyncRateLimiter
+from pubmedfetcher.types import Article
+
+class AsyncEntrezQueries:
+  """
+  Asyncio counterpart of `EntrezQueries`, for use from an event loop.
+
+  The E-utilities are exposed as coroutines sharing a pool of keep-alive connections and a
+  rate limiter, so many concurrent lookups can run on one event loop within the NCBI request
+  limits. Requests are built, retried and switched to POST the same way as by `_request`.
+
+  Requires the optional `aiohttp` package. The client is an async context manager:
+
+    async with AsyncEntrezQueries(api_key=...) as entrez:
+      async for article in entrez.iter_articles(term='crispr', max_records=1000):
+        ...
+  """
+  def __init__(self, api_key=None, rate_limiter=None, session=None, pool_size=100, timeout=(10, 60),
+               retries=3, backoff_factor=0.5, base_url=EUTILS_URL, metrics=None):
+    """
+    Args:
+      api_key (str, optional): NCBI API key, sent with every request. Raises the request limit
+        from 3 to 10 requests per second.
+      rate_limiter (AsyncRateLimiter, optional): Limiter shared by every request of this client. Share
+        one instance between the clients of an event loop using the same API key. Default: a limiter
+        matching the NCBI request limit for `api_key`.
+      session (aiohttp.ClientSession, optional): Session used for every request. Default: a new session
+        with a pool of `pool_size` connections, created on first use and closed by `close()`.
+      pool_size (int): Maximum number of connections of the default session. Default: 100
+      timeout (float or tuple): Connect and read timeouts in seconds of each request. Default: (10, 60)
+      retries (int): Number of retries of a request failing with a connection error, a timeout, or a
+        429/5xx status, with exponential backoff honoring Retry-After. Default: 3
+      backoff_factor (float): Base delay in seconds between retries. Default: 0.5
+      base_url (str): Base URL of the E-utilities. Default: EUTILS_URL
+      metrics (Metrics, optional): Metrics recording every request. Stage times are not recorded,
+        since the requests of concurrent coroutines overlap. Default: None, not recorded
+    """
+    try:
+      import aiohttp
+    except ImportError as e:
+      raise ImportError("AsyncEntrezQueries requires the `aiohttp` package: pip install 'pubmedfetcher[async]'") from e
+
+    self.baseURL = base_url.rstrip('/')
+    self.endpoint_suffix = 'fcgi'
+    self.api_key = api_key
+    self.rate_limiter = rate_limiter if rate_limiter is not None else AsyncRateLimiter.for_api_key(api_key)
+    self._owns_session = session is None
+    self.session = session
+    self.pool_size = pool_size
+    self._aiohttp = aiohttp
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    self.timeout = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+    self.retries = retries
+    self.backoff_factor = backoff_factor
+    self.metrics = metrics if metrics is not None else NULL_METRICS
+    self.logger = logging.getLogger(__name__)
+
+  def _session(self):
+    # aiohttp sessions must be created from a coroutine, on the loop they are used with
+    if self.session is None:
+      self.session = self._aiohttp.ClientSession(
+        connector=self._aiohttp.TCPConnector(limit=self.pool_size), timeout=self.timeout
+      )
+    return self.session
+
+  async def close(self):
+    """Close the connections of the session created by this client."""
+    if self._owns_session and self.session is not None:
+      await self.session.close()
+      self.session = None
+
+  async def __aenter__(self):
+    return self
+
+  async def __aexit__(self, *exc_info):
+    await self.close()
+
+  async def _query(self, endpoint, payload) -> bytes:
+    """
+    Send a request to an E-utility endpoint, within the NCBI request limits, retrying it on failure.
+
+    Args:
+      endpoint (str): Name of the E-utility (e.g. esearch, efetch).
+      payload (dict): Query parameters of the request.
+
+    Returns:
+      bytes: Body of the successful response.
+
+    Raises:
+      aiohttp.ClientResponseError: If the E-utility returned an error status.
+    """
+    if self.api_key:
+      payload = {**payload, 'api_key': self.api_key}
+
+    url = f'{self.baseURL}/{endpoint}.{self.endpoint_suffix}'
+    _, params_str, post = _encode_params(payload)
+    session = self._session()
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    waited = 0.0
+    for attempt in range(self.retries + 1):
+      # Wait for our turn to stay within the NCBI request limits
+      wait_start = loop.time()
+      await self.rate_limiter.acquire()
+      waited += loop.time() - wait_start
+
+      try:
+        if post:
+          request = session.post(url, data=params_str.encode('utf8'), headers={'Content-Type': 'application/x-www-form-urlencoded'})
+        else:
+          request = session.get(f'{url}?{params_str}')
+        async with request as response:
+          if response.status not in RETRY_STATUSES or attempt == self.retries:
+            body = await response.read()
+            self.metrics.record_request(endpoint, response.status, attempt + 1, loop.time() - start - waited, len(body))
+            response.raise_for_status()
+            return body
+          delay = _retry_delay(response, attempt, self.backoff_factor)
+          self.logger.debug(f"Request to {url} returned {response.status}, retrying in {delay:.2f}s.")
+      except (self._aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+        if attempt == self.retries: raise
+        delay = _retry_delay(None, attempt, self.backoff_factor)
+        self.logger.debug(f"Request to {url} failed ({e!r}), retrying in {delay:.2f}s.")
+
+      await asyncio.sleep(delay)
+
+  async def entrezInfo(self, **kwargs):
+    """Coroutine of `EntrezQueries.entrezInfo`."""
+    return (await self._query('einfo', kwargs)).decode('utf-8')
+
+  async def entrezSearch(self, db='pubmed', term=None, **kwargs):
+    """Coroutine of `EntrezQueries.entrezSearch`."""
+    return (await self._query('esearch', {'db': db, 'term': term, **kwargs})).decode('utf-8')
+
+  async def entrezSummary(self, db='pubmed', id=None, **kwargs):
+    """Coroutine of `EntrezQueries.entrezSummary`."""
+    return (await self._query('esummary', {'db': db, 'id': id, **kwargs})).decode('utf-8')
+
+  async def entrezFetch(self, db='pubmed', id=None, raw=False, **kwargs):
+    """
+    Coroutine of `EntrezQueries.entrezFetch`.
+
+    Args:
+      raw (bool): Return the response body as bytes instead of text, e.g. to parse it. Default: False
+    """
+    body = await self._query('efetch', {'db': db, 'id': id, **kwargs})
+    return body if raw else body.decode('utf-8')
+
+  async def entrezSearchIds(self, db='pubmed', term=None, max_records=None, page_size=10000, **kwargs) -> List[str]:
+    """Coroutine of `EntrezQueries.entrezSearchIds`."""
+    ids = []
+    while max_records is None or len(ids) < max_records:
+      retmax = page_size if max_records is None else min(page_size, max_records - len(ids))
+      search = _parse_esearch_result(await self.entrezSearch(db=db, term=term, retstart=len(ids), retmax=retmax, **kwargs))
+      ids.extend(search['ids'])
+      if not search['ids'] or len(ids) >= search['count']:
+        break
+    return ids
+
+  async def iter_articles(self, term=None, ids=None, db='pubmed', batch_size=500, max_records=None, concurrency=1,
+                          article_fetcher: PubmedArticleFetcher = None, search_params=None) -> AsyncIterator[Article]:
+    """
+    Fetch the records of a search, or of a list of UIDs, and yield their parsed articles.
+
+    A search is paged through the Entrez History Server, like `EntrezQueries.entrezFetchPages`.
+    Up to `concurrency` pages are fetched at a time, and each page is parsed on a worker thread
+    so the event loop is not blocked by the XML parsing.
+
+    Args:
+      term (str, optional): Entrez text query. Required unless `ids` is given.
+      ids (iterable, optional): UIDs of the records to fetch, instead of searching `term`.
+      db (str): Database to search. Default: pubmed
+      batch_size (int): Number of records to retrieve per efetch request. Default: 500
+      max_records (int, optional): Maximum number of records of the search to retrieve. Default: None, all of them
+      concurrency (int): Number of pages fetched in parallel. Default: 1
+      article_fetcher (PubmedArticleFetcher, optional): Parser of the records. Default: PubmedArticleFetcher()
+      search_params (dict, optional): Additional esearch parameters (e.g. sort, datetype, mindate).
+
+    Yields:
+      Article: Article details, as returned by `PubmedArticleFetcher._fetch_article_details`, in order
+    """
+    article_fetcher = article_fetcher if article_fetcher is not None else PubmedArticleFetcher()
+    fetch_params = {'db': db, 'rettype': 'xml', 'retmode': 'text'}
+
+    if ids is not None:
+      ids = list(ids)
+      pages = [{'id': ids[start:start + batch_size]} for start in range(0, len(ids), batch_size)]
+    else:
+      search = _parse_esearch_result(await self.entrezSearch(
+        db=db, term=term, **{**(search_params or {}), 'usehistory': 'y', 'retmax': 0}
+      ))
+      total = search['count'] if max_records is None else min(search['count'], max_records)
+      pages = [
+        {'WebEnv': search['webenv'], 'query_key': search['query_key'], 'retstart': retstart, 'retmax': min(batch_size, total - retstart)}
+        for retstart in range(0, total, batch_size)
+      ]
+
+    def parse(body: bytes) -> List[Article]:
+      return list(article_fetcher._iter_article_details(io.BytesIO(body)))
+
+    async def fetch_and_parse(page) -> List[Article]:
+      body = await self.entrezFetch(raw=True, **page, **fetch_params)
+      return await asyncio.to_thread(parse, body)
+
+    # At most `concurrency` pages are in flight ahead of the consumer, and they are yielded in order
+    pending = deque()
+    try:
+      for page in pages:
+        pending.append(asyncio.ensure_future(fetch_and_parse(page)))
+        if len(pending) >= max(1, concurrency):
+          for article in await pending.popleft():
+            yield article
+      while pending:
+        for article in await pending.popleft():
+          yield article
+    finally:
+      for task in pending:
+        task.cancel()
@@ -0,0 +1,190 @@
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlencode
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# Time to live in seconds of the cached responses of each E-utility.
+# Search results change as new records are indexed, records fetched by UID rarely do.
+DEFAULT_TTLS = {
+  'einfo': DAY,
+  'esearch': HOUR,
+  'esummary': 7 * DAY,
+  'efetch': 30 * DAY,
+}
+
+# Time to live of responses to requests made against the Entrez History Server (WebEnv/query_key).
+# Such requests are only ever repeated when the esearch that created the WebEnv is served from the cache.
+HISTORY_TTL = HOUR
+
+# Parameters which do not affect the content of the response
+IGNORED_PARAMS = frozenset({'api_key', 'tool', 'email'})
+
+def default_cache_dir() -> str:
+  """Return the default cache directory: `$XDG_CACHE_HOME/pubmedfetcher`, or `~/.cache/pubmedfetcher`."""
+  base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+  return os.path.join(base, 'pubmedfetcher')
+
+class ResponseCache:
+  """
+  On-disk cache of E-utilities responses, stored in a SQLite database.
+
+  Responses are addressed by a hash of the endpoint URL and the normalized request parameters,
+  and expire after a time to live depending on the E-utility. The cache is bounded in size: when
+  it grows past `max_size` bytes, the least recently used responses are evicted.
+
+  Cache hits do not write to the database: their access times are kept in memory and written with
+  the next stored response, or when the cache is closed, so a run served from the cache stays read-only.
+  """
+  def __init__(self, cache_dir=None, max_size=1024 ** 3, ttls=None):
+    """
+    Args:
+      cache_dir (str, optional): Directory of the cache database. Default: `default_cache_dir()`
+      max_size (int): Maximum size in bytes of the (compressed) cached responses. Default: 1 GiB
+      ttls (dict, optional): Time to live in seconds per E-utility, overriding `DEFAULT_TTLS`.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+
+    self.path = os.path.join(cache_dir, 'responses.sqlite3')
+    self.max_size = max_size
+    self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+    self.hits = 0
+    self.misses = 0
+    # Access times of the cache hits not yet written to the database, by key
+    self._accessed = {}
+
+    # The cache is shared by the threads fetching pages concurrently
+    self._lock = threading.Lock()
+    self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+    self._db.execute('PRAGMA journal_mode=WAL')
+    self._db.execute(
+      'CREATE TABLE IF NOT EXISTS responses ('
+      '  key TEXT PRIMARY KEY, endpoint TEXT, body BLOB, size INTEGER,'
+      '  created_at REAL, expires_at REAL, accessed_at REAL'
+      ')'
+    )
+    self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+    self._db.commit()
+
+  @staticmethod
+  def _endpoint(url) -> str:
+    """Name of the E-utility of an endpoint URL, e.g. `efetch` for `.../efetch.fcgi`."""
+    return url.rstrip('/').rsplit('/', 1)[-1].split('.', 1)[0]
+
+  @staticmethod
+  def key(url, params) -> str:
+    """
+    Compute the cache key of a request.
+
+    Args:
+      url (str): Endpoint URL.
+      params (dict): Request parameters, as constructed by `_contruct_params`.
+
+    Returns:
+      str: SHA-256 hex digest of the URL and the parameters sorted by name,
+        excluding parameters which do not affect the response (api_key, tool, email).
+    """
+    normalized = sorted((key, str(value)) for key, value in params.items() if key not in IGNORED_PARAMS)
+    return hashlib.sha256(f'{url}?{urlencode(normalized)}'.encode('utf8')).hexdigest()
+
+  def _ttl(self, url, params) -> float:
+    endpoint = self._endpoint(url)
+    if 'WebEnv' in params or 'query_key' in params:
+      return min(HISTORY_TTL, self.ttls.get(endpoint, HISTORY_TTL))
+    return self.ttls.get(endpoint, HOUR)
+
+  def get(self, url, params):
+    """
+    Look up the cached response body of a request.
+
+    Returns:
+      bytes: The response body, or None if the request is not cached or has expired.
+    """
+    key = self.key(url, params)
+    now = time.time()
+    with self._lock:
+      row = self._db.execute('SELECT body, expires_at FROM responses WHERE key = ?', (key,)).fetchone()
+      if row is None or row[1] <= now:
+        self.misses += 1
+        return None
+
+      self.hits += 1
+      self._accessed[key] = now
+    return zlib.decompress(row[0])
+
+  def set(self, url, params, body) -> None:
+    """
+    Store the response body of a request, evicting the least recently used responses if needed.
+
+    Args:
+      url (str): Endpoint URL.
+      params (dict): Request parameters, as constructed by `_contruct_params`.
+      body (bytes): Response body.
+    """
+    ttl = self._ttl(url, params)
+    if ttl <= 0:
+      return
+
+    data = zlib.compress(body)
+    now = time.time()
+    with self._lock:
+      self._db.execute(
+        'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+        (self.key(url, params), self._endpoint(url), data, len(data), now, now + ttl, now)
+      )
+      # The least recently used responses are evicted according to the latest access times
+      self._write_accessed()
+      self._evict(now)
+      self._db.commit()
+
+  def _write_accessed(self) -> None:
+    """Write the access times of the cache hits since the last write, within the current transaction."""
+    if self._accessed:
+      self._db.executemany('UPDATE responses SET accessed_at = ? WHERE key = ?', [(at, key) for key, at in self._accessed.items()])
+      self._accessed.clear()
+
+  def _evict(self, now) -> None:
+    """Drop expired responses, then the least recently used ones until the cache fits `max_size`."""
+    self._db.execute('DELETE FROM responses WHERE expires_at <= ?', (now,))
+
+    size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+    if size <= self.max_size:
+      return
+
+    evicted = []
+    for key, entry_size in self._db.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+      if size <= self.max_size:
+        break
+      evicted.append((key,))
+      size -= entry_size
+    self._db.executemany('DELETE FROM responses WHERE key = ?', evicted)
+
+  def stats(self) -> dict:
+    """
+    Returns:
+      dict: Cache statistics of this session: hits, misses, hit_rate, and the number of entries
+        and total size in bytes of the cache.
+    """
+    with self._lock:
+      entries, size = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+    lookups = self.hits + self.misses
+    return {
+      'hits': self.hits,
+      'misses': self.misses,
+      'hit_rate': self.hits / lookups if lookups else 0.0,
+      'entries': entries,
+      'size': size,
+    }
+
+  def close(self) -> None:
+    """Write the pending access times and close the database."""
+    with self._lock:
+      self._write_accessed()
+      self._db.commit()
+      self._db.close()
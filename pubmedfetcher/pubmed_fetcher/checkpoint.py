@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+def file_digest(path: str) -> str:
+  """SHA-256 digest of the contents of a file, e.g. the PMIDs file of a job, read in chunks."""
+  digest = hashlib.sha256()
+  with open(path, 'rb') as file:
+    for chunk in iter(lambda: file.read(1 << 20), b''):
+      digest.update(chunk)
+  return digest.hexdigest()
+
+class Checkpoint:
+  """
+  Progress of a long-running fetch job, saved to a JSON file after each fetched batch.
+
+  The state records the job (search term or PMIDs file and its digest, output file and format), how to resume
+  fetching (the Entrez History Server WebEnv/query_key, and the number of records completed), and
+  the size of the output written so far, so an interrupted job can continue from its last batch.
+  """
+  def __init__(self, path: str):
+    """
+    Args:
+      path (str): Path of the checkpoint file.
+    """
+    self.path = path
+
+  def load(self) -> Optional[Dict[str, Any]]:
+    """
+    Returns:
+      dict: The saved state, or None if there is no checkpoint.
+
+    Raises:
+      ValueError: If the checkpoint file is not a valid checkpoint.
+    """
+    try:
+      with open(self.path, encoding='utf-8') as file:
+        state = json.load(file)
+    except FileNotFoundError:
+      return None
+    except json.JSONDecodeError as e:
+      raise ValueError(f"Invalid checkpoint {self.path}: {e}") from e
+    if not isinstance(state, dict) or 'job' not in state or 'completed' not in state:
+      raise ValueError(f"Invalid checkpoint {self.path}.")
+    return state
+
+  def save(self, state: Dict[str, Any]) -> None:
+    """
+    Save the state. The checkpoint file is replaced atomically and synced to disk,
+    so a crash leaves either the previous or the new checkpoint.
+    """
+    state = {**state, 'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z')}
+    temp_path = f'{self.path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+      json.dump(state, file, indent=2)
+      file.flush()
+      os.fsync(file.fileno())
+    os.replace(temp_path, self.path)
+
+  def remove(self) -> None:
+    """Delete the checkpoint, once the job is complete."""
+    try:
+      os.remove(self.path)
+    except FileNotFoundError:
+      pass
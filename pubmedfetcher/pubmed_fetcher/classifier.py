@@ -0,0 +1,113 @@
+import hashlib
+import json
+import re
+import tomllib
+from functools import lru_cache
+from typing import Iterable
+
+# Keywords found in the affiliations of academic institutions, matched anywhere in the affiliation
+ACADEMIC_KEYWORDS = (
+  'university', 'lab', '.edu', 'college', 'school of', 'institute of', 'academic', 'academia', 'faculty of',
+)
+
+# Legal entity suffixes of companies, matched as whole words. A company keyword takes precedence over
+# academic keywords, e.g. "Eisai Inc., Global Research Lab" is a company affiliation. The dotted
+# abbreviations cannot follow another dotted letter, so "U.S.A." does not contain "S.A.".
+COMPANY_KEYWORDS = (
+  'inc', 'ltd', 'llc', 'plc', 'gmbh', 'corp', 'corporation', 'limited', 's.a.', 'b.v.',
+)
+
+# Version of the keyword matching rules, part of the fingerprint of the classifiers
+MATCHING_VERSION = 2
+
+class AffiliationClassifier:
+  """
+  Classify author affiliations as academic or non-academic.
+
+  Each affiliation is lowercased once, checked for the company keywords with a regular expression
+  when it contains one of them, and for the academic keywords with substring tests. A single verdict
+  costs no less than the former per-keyword loop: the speedup comes entirely from memoizing the verdicts,
+  as the same affiliation strings are repeated across the authors and articles of a result set.
+  """
+  def __init__(self, academic_keywords: Iterable[str] = ACADEMIC_KEYWORDS,
+               company_keywords: Iterable[str] = COMPANY_KEYWORDS, cache_size: int = 65536):
+    """
+    Args:
+      academic_keywords (iterable of str): Keywords of academic affiliations, matched anywhere (case-insensitive).
+      company_keywords (iterable of str): Keywords of company affiliations, matched as whole words (case-insensitive).
+      cache_size (int): Maximum number of memoized verdicts, 0 to disable the memoization. Default: 65536
+    """
+    self.academic_keywords = tuple(dict.fromkeys(keyword.lower() for keyword in academic_keywords))
+    self.company_keywords = tuple(dict.fromkeys(keyword.lower() for keyword in company_keywords))
+
+    # The company keywords are matched as whole words, not preceded or followed by a letter or digit, 
+    # which substring tests cannot express. Scanning every affiliation with the pattern is slower than
+    # a substring test per keyword though, so it only runs on the affiliations containing a company
+    # keyword, and the academic keywords, matched anywhere, only use substring tests.
+    alternation = '|'.join(
+      # Dotted abbreviations, e.g. "s.a.", must not continue another one, like "u.s.a."
+      rf'(?<!\w\.){re.escape(keyword)}' if '.' in keyword else re.escape(keyword)
+      for keyword in sorted(self.company_keywords, key=len, reverse=True)
+    )
+    self._company_pattern = re.compile(rf'(?<![^\W_])(?:{alternation})(?![^\W_])') if alternation else None
+
+    self.is_academic = lru_cache(maxsize=cache_size)(self._classify)
+
+  @property
+  def fingerprint(self) -> str:
+    """Digest of the keywords, which changes whenever the verdicts of the classifier may change."""
+    keywords = json.dumps([MATCHING_VERSION, sorted(self.academic_keywords), sorted(self.company_keywords)])
+    return hashlib.sha256(keywords.encode('utf8')).hexdigest()[:16]
+
+  @classmethod
+  def from_config(cls, path: str, **kwargs) -> "AffiliationClassifier":
+    """
+    Create a classifier with the default keywords extended by the keywords of a TOML config file.
+
+    Expected structure:
+      [academic]
+      keywords = ["hospital", "medical center"]
+
+      [company]
+      keywords = ["pharmaceuticals", "therapeutics"]
+
+    Args:
+      path (str): Path of the TOML config file.
+      **kwargs: Additional arguments of the classifier (e.g. cache_size).
+    """
+    with open(path, 'rb') as file:
+      config = tomllib.load(file)
+
+    return cls(
+      ACADEMIC_KEYWORDS + tuple(config.get('academic', {}).get('keywords', ())),
+      COMPANY_KEYWORDS + tuple(config.get('company', {}).get('keywords', ())),
+      **kwargs
+    )
+
+  def _classify(self, affiliation: str) -> bool:
+    """
+    Check if a given affiliation string indicates an academic institution.
+
+    Args:
+      affiliation (str): The affiliation string to check. Can be None or empty.
+
+    Returns:
+      bool: True if the affiliation contains an academic keyword and no company keyword, False otherwise.
+    """
+    if not affiliation:
+      return False
+
+    text = affiliation.lower()
+    # Plain loops: `any()` over a generator expression costs more than the substring tests themselves
+    for keyword in self.company_keywords:
+      if keyword in text:
+        if self._company_pattern.search(text):
+          return False
+        break
+    for keyword in self.academic_keywords:
+      if keyword in text:
+        return True
+    return False
+
+# Classifier with the default keywords, shared by the module level helpers
+default_classifier = AffiliationClassifier()
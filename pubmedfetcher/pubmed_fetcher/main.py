@@ -1,102 +1,454 @@
 import argparse
 import logging
-import pandas as pd
-import xml.etree.ElementTree as ET
+import os
+import sys
+from datetime import date
+from itertools import islice
 from pubmedfetcher.pubmed_fetcher import setup_logging
-from pubmedfetcher.pubmed_fetcher.modules import EntrezQueries, PubmedArticleFetcher
+from pubmedfetcher.pubmed_fetcher.metrics import NULL_METRICS, Metrics
+from pubmedfetcher.pubmed_fetcher.shards import in_shard, parse_shard
+from pubmedfetcher.pubmed_fetcher.writers import WRITERS, open_writer, output_path
+from pubmedfetcher.types import ROW_FIELDS
+
+# The modules depending on requests, sqlite3 or multiprocessing are imported by main() once the
+# arguments are parsed, and only when needed, so `--help` and small queries start fast.
+
+# Column of the queries matching each paper, in batch mode (-q/--queries)
+QUERIES_FIELD = "Matched Queries"
+
+def _read_queries(path):
+  """Read the search terms of a queries file, one per line. Blank lines and lines starting with `#` are skipped."""
+  with open(path, encoding='utf-8') as file:
+    queries = [line.strip() for line in file]
+  return list(dict.fromkeys(query for query in queries if query and not query.startswith('#')))
+
+def _parse_pages(article_fetcher, efetch_pages):
+  """
+  Parse streamed efetch pages and yield their articles one at a time.
+
+  `article_fetcher` is either a `PubmedArticleFetcher` or an `ArticleParserPool`.
+  """
+  for efetch in efetch_pages:
+    yield from article_fetcher._iter_article_details(efetch)
+
+def _sync_articles(entrez, store, article_fetcher, query, args):
+  """
+  Synchronize the article store with the results of a search, and yield the articles of the search.
+
+  Only the articles missing from the store, classified with other keywords, or revised since the query
+  was last synchronized (found by searching on the modification date, `datetype=mdat`), are fetched
+  from PubMed. They bypass the response cache, which may still hold the records before their revision.
+  """
+  logger = logging.getLogger(__name__)
+  synced_at = date.today().strftime("%Y/%m/%d")
+
+  ids = list(entrez.entrezHistoryIds(db='pubmed', term=query, max_records=args.retmax))
+  to_fetch = set(store.missing(ids))
+  new_count = len(to_fetch)
+
+  last_sync = store.last_sync(query)
+  if last_sync:
+    revised = entrez.entrezHistoryIds(
+      db='pubmed', term=query, search_params={'datetype': 'mdat', 'mindate': last_sync, 'maxdate': synced_at}
+    )
+    to_fetch.update(set(revised).intersection(ids))
+
+  logger.debug(f"{len(ids)} article(s) found: {new_count} new or classified with other keywords, {len(to_fetch) - new_count} revised since {last_sync}.")
+
+  efetch_pages = entrez.entrezFetchIds(
+    [pmid for pmid in ids if pmid in to_fetch], db='pubmed', batch_size=args.batch_size, 
+    rettype='xml', retmode='text', stream=True, concurrency=args.concurrency, use_cache=False
+  )
+  # Store every article, including those without non-academic authors, 
+  # and save the progress after each page
+  for efetch in efetch_pages:
+    for article in article_fetcher._iter_article_details(efetch):
+      store.put(article)
+    store.commit()
+
+  store.set_last_sync(query, synced_at)
+  store.commit()
+  yield from store.get_many(ids)
+
+def _read_ids(path):
+  """
+  Read PMIDs from a file, or from stdin if `path` is `-`, one at a time.
+
+  PMIDs are separated by whitespace or commas. Blank lines and lines starting with `#` are skipped,
+  and tokens which are not PMIDs are logged and skipped.
+  """
+  logger = logging.getLogger(__name__)
+  file = sys.stdin if path == '-' else open(path, encoding='utf-8')
+  try:
+    for line in file:
+      if line.startswith('#'):
+        continue
+      for pmid in line.replace(',', ' ').split():
+        if pmid.isdigit():
+          yield pmid
+        else:
+          logger.warning(f"Skipping invalid PMID: {pmid}")
+  finally:
+    if file is not sys.stdin:
+      file.close()
+
+def _search_queries(entrez, queries, args):
+  """
+  Run the search of each query and map each matching PMID to the queries it matched.
+
+  The PMIDs are listed through the History Server, so a query can match more than the
+  10,000 records esearch gives access to.
+
+  Returns:
+    dict: Queries matching each PMID, keyed by PMID in the order the PMIDs were first found.
+  """
+  logger = logging.getLogger(__name__)
+  query_map = {}
+  total = 0
+  for query in queries:
+    ids = list(entrez.entrezHistoryIds(db='pubmed', term=query, max_records=args.retmax))
+    total += len(ids)
+    for pmid in ids:
+      query_map.setdefault(pmid, []).append(query)
+    logger.info(f"{len(ids)} article(s) found for query: {query}")
+  logger.info(f"{total} article(s) found for {len(queries)} queries, {len(query_map)} unique.")
+  return query_map
+
+def _load_checkpoint(checkpoint, job, resume):
+  """
+  Load the state of a checkpointed job, or create the state of a job starting from the beginning.
+
+  Returns:
+    dict: State of the job, and whether it resumes an interrupted run.
+
+  Raises:
+    ValueError: If the checkpoint belongs to another job, or the output no longer matches it.
+  """
+  logger = logging.getLogger(__name__)
+  state = checkpoint.load() if resume else None
+  if state is None:
+    if resume:
+      logger.info(f"No checkpoint found at {checkpoint.path}, starting from the beginning.")
+    return {'job': job, 'search': None, 'completed': 0, 'output_size': 0, 'rows_written': 0}, False
+
+  if job['ids'] and state['job'].get('ids') == job['ids'] and state['job'].get('ids_sha256') != job['ids_sha256']:
+    raise ValueError(f"The PMIDs file {job['ids']} has changed since the checkpoint {checkpoint.path} was saved.")
+  if state['job'] != job:
+    raise ValueError(f"The checkpoint {checkpoint.path} belongs to another job: {state['job']}")
+  if not os.path.exists(job['output']) or os.path.getsize(job['output']) < state['output_size']:
+    raise ValueError(f"The output {job['output']} is missing the {state['rows_written']} row(s) recorded by the checkpoint.")
+  # Drop the rows written after the last checkpoint, their batch is fetched again
+  os.truncate(job['output'], state['output_size'])
+  logger.info(f"Resuming from record {state['completed']}, {state['rows_written']} row(s) already written to {job['output']}.")
+  return state, True
+
+def _resume_search(entrez, query, state):
+  """
+  Return the search of a checkpointed job on the Entrez History Server, searching again if its WebEnv expired.
+
+  The search is recorded in the job state, to be resumed by a later run.
+  """
+  from pubmedfetcher.pubmed_fetcher.__init__ import _parse_esearch_result
+
+  logger = logging.getLogger(__name__)
+  previous = state['search']
+  search = None
+  if previous:
+    search = entrez.entrezSearchHistory(db='pubmed', webenv=previous['webenv'], query_key=previous['query_key'])
+    if search is None:
+      logger.warning("The WebEnv of the checkpoint has expired, searching again.")
+  if search is None:
+    search = _parse_esearch_result(entrez.entrezSearch(db='pubmed', term=query, usehistory='y', retmax=0))
+    # The results of a new search only line up with the completed offset if no record was added or removed
+    if previous and search['count'] != previous['count']:
+      logger.warning(f"The search now matches {search['count']} record(s) instead of {previous['count']}, "
+                     f"records around offset {state['completed']} may be skipped or repeated.")
+  state['search'] = {'webenv': search['webenv'], 'query_key': search['query_key'], 'count': search['count']}
+  return search
+
+def _checkpoint_pages(efetch_pages, checkpoint, state, writer, batch_size):
+  """
+  Yield the efetch pages of a checkpointed job, and save its progress once the articles of each page are written.
+
+  The articles of a page are all consumed before the next page is requested, so the progress is saved
+  when the consumer asks for the next page, after the output is flushed to disk. The initial state,
+  with the search and the output header, is saved before the first page is fetched.
+  """
+  writer.flush()
+  state['output_size'] = os.path.getsize(writer.path)
+  checkpoint.save(state)
+  rows_written = writer.rows_written
+  for efetch in efetch_pages:
+    yield efetch
+    writer.flush()
+    state['completed'] += batch_size
+    state['rows_written'] += writer.rows_written - rows_written
+    state['output_size'] = os.path.getsize(writer.path)
+    rows_written = writer.rows_written
+    checkpoint.save(state)
 
 def main():
   parser = argparse.ArgumentParser(
     description=f"""Fetch research papers from NCBI Entrez database based on a query specified and with at least one author 
     affiliated with a 'Pharaceutical' or 'BioTech' Company. 
-    And store the result as a CSV file or print to the Console based on the based on provided file(-f or --file) parameter.
+    And store the result as a CSV, JSON Lines or Parquet file or print to the Console based on the based on provided file(-f or --file) parameter.
     
     Usage Example: get-papers-list `<query-string>` [-d] [-max RETMAX] [-type RETTYPE] [-mode RETMODE]
   
   """)
   
-  parser.add_argument("term", type=str, help="The search term to query the database with.")
+  parser.add_argument("term", type=str, nargs='?', default=None, help="The search term to query the database with.")
+  parser.add_argument("-q", "--queries", default=None, help="File of search terms, one per line. Each matching paper is fetched once, and the queries it matched are listed in the \"Matched Queries\" column.")
+  parser.add_argument("-i", "--ids", default=None, help="File of PMIDs to fetch instead of searching, one per line or separated by commas. Use - to read them from stdin.")
   parser.add_argument("-f", "--file", default=None, help="Output File name to save the result. Default = None, Print the output to the console",)
+  parser.add_argument("--format", choices=WRITERS, default=None, help="Output format. Default = csv with -f/--file, table printed to the console otherwise.")
   parser.add_argument("-d", "--debug", action="store_true", help="Enable debug mode. Print debug Infomation during execution")
   parser.add_argument('-max', '--retmax', type=int, default=20, help="Number of record to return with the matching search term. Default=20.")
+  parser.add_argument('-w', '--workers', type=int, default=1, help="Number of processes parsing the fetched papers. Default=1, parse in the main process.")
+  parser.add_argument('-k', '--keywords', default=None, help="TOML file of additional academic and company affiliation keywords.")
+  parser.add_argument('-b', '--batch-size', type=int, default=500, help="Number of records to fetch per request from the Entrez History Server. Default=500.")
+  parser.add_argument('-c', '--concurrency', type=int, default=1, help="Number of batches fetched in parallel, within the NCBI request rate limit. Default=1.")
+  parser.add_argument('--api-key', default=os.environ.get('NCBI_API_KEY'), help="NCBI API key, raises the request rate limit from 3 to 10 requests/second. Default=$NCBI_API_KEY.")
+  parser.add_argument('--timeout', type=float, default=60, help="Timeout in seconds of each request to NCBI. Default=60.")
+  parser.add_argument('--retries', type=int, default=3, help="Number of retries of requests failing with a network error, 429 or 5xx status. Default=3.")
+  parser.add_argument('--cache-dir', default=None, help="Directory of the on-disk cache of NCBI responses. Default=$XDG_CACHE_HOME/pubmedfetcher or ~/.cache/pubmedfetcher.")
+  parser.add_argument('--no-cache', action="store_true", help="Do not read or store responses in the on-disk cache.")
+  parser.add_argument('--store', default=None, help="SQLite article store. Only the papers missing from the store, or revised since the last run of the query, are fetched.")
+  parser.add_argument('--min-year', type=int, default=None, help="Only fetch the papers published this year or later.")
+  parser.add_argument('--max-year', type=int, default=None, help="Only fetch the papers published this year or earlier.")
+  parser.add_argument('--publication-type', action='append', default=[], help="Only fetch the papers of this publication type, e.g. \"Clinical Trial\". Can be repeated.")
+  parser.add_argument('--exclude-publication-type', action='append', default=[], help="Do not fetch the papers of this publication type, e.g. Review. Can be repeated.")
+  parser.add_argument('--journal', action='append', default=[], help="Only fetch the papers published in this journal, full name or abbreviation. Can be repeated.")
+  parser.add_argument('--stats', action="store_true", help="Print the time spent in each stage (network, parse, classify, write) and the request statistics at the end of the run.")
+  parser.add_argument('--metrics-file', default=None, help="Write the run metrics to a JSON file, or to a Prometheus textfile if the name ends with .prom.")
+  parser.add_argument('--checkpoint', default=None, help="Checkpoint file recording the progress of the job after each batch, for a search term or a PMIDs file written to a csv or jsonl file.")
+  parser.add_argument('--shard', type=parse_shard, default=None, metavar='I/N', help="Only fetch the papers of shard I of N (numbered from 0), partitioned by a stable hash of the PMID, to spread a harvest over N hosts. See merge-papers-list.")
+  parser.add_argument('--resume', action="store_true", help="Resume the job from its --checkpoint, appending to the output file. Starts from the beginning if there is no checkpoint.")
   args = parser.parse_args()
   args_dict = vars(args)
   
   setup_logging(args.debug)
   logger = logging.getLogger(__name__)
 
-  keys_to_remove = ["term", "debug", "file"]
+  keys_to_remove = ["term", "queries", "ids", "debug", "file", "format", "workers", "keywords", "batch_size", "concurrency", "api_key", "timeout", "retries", "cache_dir", "no_cache", "store", "min_year", "max_year", "publication_type", "exclude_publication_type", "journal", "stats", "metrics_file", "checkpoint", "resume", "shard"]
   args_dict = {key: value for key, value in args_dict.items() if key not in keys_to_remove}
   
+  query = None
+  if args.ids:
+    if args.term or args.queries:
+      parser.error("-i/--ids cannot be used with a search term or -q/--queries")
+    if args.store:
+      parser.error("--store cannot be used with -i/--ids")
+  elif args.queries:
+    if args.term:
+      parser.error("the search term and -q/--queries cannot be used together")
+    if args.store:
+      parser.error("--store cannot be used with -q/--queries")
+    queries = _read_queries(args.queries)
+    if not queries:
+      print(f"No search term found in {args.queries}.")
+      exit(1)
   # Exit when args.term is None or an empty/whitespace-only string.
-  if not args.term or not args.term.strip():
+  elif not args.term or not args.term.strip():
     print("Search term `term` to query the database cannot be `None` or empty.")
     exit(1)
-
-  query = f'{args.term}'.strip() 
+  else:
+    query = f'{args.term}'.strip() 
   logger.debug(f'args: {args}\nargs dict: {args_dict}')
 
+  # Output results: Save to a file, or default to console if -f/--file flag with file path missing
+  output_format = args.format or ('csv' if args.file else 'table')
+  if args.file and output_format == 'table':
+    parser.error("the table format is printed to the console and cannot be used with -f/--file")
+  output_file = output_path(args.file, output_format) if args.file else None
+  fieldnames = ROW_FIELDS + (QUERIES_FIELD,) if args.queries else ROW_FIELDS
+
+  if args.shard and args.store:
+    parser.error("--shard cannot be used with --store")
+  if args.resume and not args.checkpoint:
+    parser.error("--resume requires --checkpoint")
+  if args.checkpoint:
+    if args.queries or args.store:
+      parser.error("--checkpoint cannot be used with -q/--queries or --store")
+    if args.ids == '-':
+      parser.error("--checkpoint cannot be used with PMIDs read from stdin")
+    if not output_file or not WRITERS[output_format].appendable:
+      parser.error("--checkpoint requires a csv or jsonl output file (-f/--file)")
+
+  from pubmedfetcher.pubmed_fetcher.classifier import AffiliationClassifier
+  from pubmedfetcher.pubmed_fetcher.modules import EntrezQueries, PubmedArticleFetcher
+  from pubmedfetcher.pubmed_fetcher.prefilter import DocSumFilter
+
+  # Records are first filtered on their lightweight DocSums when any of the filters is given
+  docsum_filter = DocSumFilter(
+    args.min_year, args.max_year, args.publication_type, args.exclude_publication_type, args.journal
+  )
+  if docsum_filter.active and args.store:
+    parser.error("--store cannot be used with the publication year, type or journal filters")
+  if docsum_filter.active and args.checkpoint:
+    parser.error("--checkpoint cannot be used with the publication year, type or journal filters")
+
+  checkpoint = None
+  resuming = False
+  if args.checkpoint:
+    from pubmedfetcher.pubmed_fetcher.checkpoint import Checkpoint, file_digest
+    checkpoint = Checkpoint(args.checkpoint)
+    try:
+      # The PMIDs file is identified by its contents, so a resumed job skips the same PMIDs
+      job = {
+        'term': query, 'ids': args.ids, 'ids_sha256': file_digest(args.ids) if args.ids else None,
+        'max_records': args.retmax, 'shard': list(args.shard) if args.shard else None,
+        'output': output_file, 'format': output_format
+      }
+      state, resuming = _load_checkpoint(checkpoint, job, args.resume)
+    except (OSError, ValueError) as e:
+      parser.error(str(e))
+
+  cache = None
+  if not args.no_cache:
+    from pubmedfetcher.pubmed_fetcher.cache import ResponseCache
+    cache = ResponseCache(args.cache_dir)
+
+  parser_pool = None
+  store = None
+  metrics = Metrics() if args.stats or args.metrics_file else NULL_METRICS
+
   try:
-    logger.debug(f"\nSearching PubMed with Query: {query}\nAnd with parameters, {' '.join([f"{key}={value}" for key, value in args_dict.items()])}")
-    
-    # Search Pubmed paper based on search Query 
-    esearch = EntrezQueries().entrezSearch(db='pubmed', term=query, **args_dict)
-    if 'eSearchResult' not in esearch:
-      raise ValueError("Invalid Search Response.")
-    
-    # Get the Ids of all pubmed papers for the search results
-    search_tree_eSearchResult = ET.fromstring(esearch)
-    ids = [id.text for id in search_tree_eSearchResult.findall(".//IdList/Id")]
+    classifier = AffiliationClassifier.from_config(args.keywords) if args.keywords else AffiliationClassifier()
+    # Parse on a pool of worker processes when requested, the results are the same as the serial parser's
+    if args.workers > 1:
+      from pubmedfetcher.pubmed_fetcher.parallel import ArticleParserPool
+      article_fetcher = parser_pool = ArticleParserPool(args.workers, classifier, metrics=metrics)
+    else:
+      article_fetcher = PubmedArticleFetcher(classifier, metrics=metrics)
 
-    logger.debug(f"\nFetching the papers from the pubmed database.")
-    # Fetch the papers from the pubmed database for given list of ids.
-    efetch = EntrezQueries().entrezFetch(db='pubmed', id=ids, rettype='xml', retmode='text')
-    if "PubmedArticle" not in efetch:
-      raise ValueError("Invalid Fetch Response.")
+    if args.store:
+      from pubmedfetcher.pubmed_fetcher.store import ArticleStore
+      store = ArticleStore(args.store, classifier.fingerprint)
+
+    logger.debug(f"\nSearching PubMed with Query: {query or (', '.join(queries) if args.queries else 'PMIDs from ' + args.ids)}\nAnd with parameters, {' '.join([f'{key}={value}' for key, value in args_dict.items()])}")
     
-    # Get all the XML element with tag 'PubmedArticle'
-    search_tree_PubmedArticleSet = ET.fromstring(efetch)
-    pubmed_articles = [pubmed_article for pubmed_article in search_tree_PubmedArticleSet.findall(".//PubmedArticle")]
+    logger.debug(f"\nFetching the papers from the pubmed database.")
+    with EntrezQueries(
+      api_key=args.api_key, pool_size=max(10, args.concurrency), timeout=(10, args.timeout), retries=args.retries, 
+      cache=cache, metrics=metrics
+    ) as entrez, open_writer(output_format, output_file, fieldnames, append=resuming) as writer:
+      if args.ids:
+        # Stream the PMIDs straight into batched efetch POST requests, without searching, 
+        # and download the next batch while the current one is parsed
+        ids = _read_ids(args.ids)
+        if args.shard:
+          ids = in_shard(ids, args.shard)
+        if checkpoint is not None:
+          ids = islice(ids, state['completed'], None)
+        if docsum_filter.active:
+          ids = docsum_filter.filter_ids(entrez.entrezSummaryIds(ids, batch_size=args.batch_size))
+        efetch_pages = entrez.entrezFetchIds(
+          ids, db='pubmed', batch_size=args.batch_size, 
+          rettype='xml', retmode='text', stream=True, concurrency=args.concurrency, prefetch=True
+        )
+        if checkpoint is not None:
+          efetch_pages = _checkpoint_pages(efetch_pages, checkpoint, state, writer, args.batch_size)
+        articles = _parse_pages(article_fetcher, efetch_pages)
+      elif args.queries:
+        # Search all the queries first, and fetch each paper matched by any of them only once
+        query_map = _search_queries(entrez, queries, args)
+        ids = in_shard(query_map, args.shard) if args.shard else query_map
+        if docsum_filter.active:
+          ids = docsum_filter.filter_ids(entrez.entrezSummaryIds(ids))
+        efetch_pages = entrez.entrezFetchIds(
+          ids, db='pubmed', batch_size=args.batch_size, 
+          rettype='xml', retmode='text', stream=True, concurrency=args.concurrency
+        )
+        articles = _parse_pages(article_fetcher, efetch_pages)
+      elif store is not None:
+        # Fetch only the new and revised papers, and read the others from the article store
+        articles = _sync_articles(entrez, store, article_fetcher, query, args)
+      elif docsum_filter.active:
+        # Retrieve the DocSums of the search results first, and only fetch the full records passing the filter
+        if args.shard:
+          shard_ids = in_shard(entrez.entrezHistoryIds(db='pubmed', term=query, max_records=args.retmax), args.shard)
+          docsums = entrez.entrezSummaryIds(shard_ids)
+        else:
+          docsums = entrez.entrezSummaryPages(db='pubmed', term=query, max_records=args.retmax)
+        ids = docsum_filter.filter_ids(docsums)
+        efetch_pages = entrez.entrezFetchIds(
+          ids, db='pubmed', batch_size=args.batch_size, 
+          rettype='xml', retmode='text', stream=True, concurrency=args.concurrency
+        )
+        articles = _parse_pages(article_fetcher, efetch_pages)
+      else:
+        # Search Pubmed paper based on search Query, keeping the results on the Entrez History Server,
+        # and fetch the matching papers page by page from the pubmed database.
+        # A checkpointed job resumes from the search recorded on the History Server
+        search = _resume_search(entrez, query, state) if checkpoint is not None else None
+        if args.shard:
+          # Every shard lists the PMIDs of the whole search, and only fetches its own slice of them
+          ids = in_shard(entrez.entrezHistoryIds(db='pubmed', term=query, max_records=args.retmax, search=search), args.shard)
+          if checkpoint is not None:
+            ids = islice(ids, state['completed'], None)
+          efetch_pages = entrez.entrezFetchIds(
+            ids, db='pubmed', batch_size=args.batch_size, 
+            rettype='xml', retmode='text', stream=True, concurrency=args.concurrency, prefetch=True
+          )
+        else:
+          efetch_pages = entrez.entrezFetchPages(
+            db='pubmed', term=query, batch_size=args.batch_size, max_records=args.retmax, 
+            rettype='xml', retmode='text', stream=True, concurrency=args.concurrency,
+            search=search, start=state['completed'] if checkpoint is not None else 0
+          )
+        if checkpoint is not None:
+          efetch_pages = _checkpoint_pages(efetch_pages, checkpoint, state, writer, args.batch_size)
+        # Each page is streamed and parsed one article at a time, 
+        # so only a single page is ever held in memory.
+        articles = _parse_pages(article_fetcher, efetch_pages)
+
+      # Write the papers with at least one author affiliated with a pharmaceutical 
+      # or biotech company as soon as they are parsed.
+      logger.debug(f"Writing the papers as {output_format}" + (f" to {output_file}" if output_file else "") + ".")
+      matches = dict.fromkeys(queries, 0) if args.queries else None
+      for article_details in articles:
+        # Author affiliated to non-academic institution
+        if article_details.non_academic_authors:
+          row = article_details.to_row()
+          if args.queries:
+            matched = query_map.get(article_details.pubmed_id, ())
+            row[QUERIES_FIELD] = "; ".join(matched)
+            for matched_query in matched:
+              matches[matched_query] += 1
+          with metrics.timer('write'):
+            writer.write(row)
+          metrics.increment('rows_written')
+
+    if args.queries:
+      for batch_query, count in matches.items():
+        logger.info(f"{count} paper(s) with a company affiliated author for query: {batch_query}")
+    # The job is complete, a later --resume starts it again from the beginning
+    if checkpoint is not None:
+      checkpoint.remove()
   except Exception as e:
     logger.error(f"Error: {e}")
     raise exit(1)
+  finally:
+    if parser_pool is not None:
+      parser_pool.close()
+    # Report the metrics of failed runs too
+    if args.stats:
+      logger.info(metrics.summary())
+    if args.metrics_file:
+      metrics.write(args.metrics_file)
   
   logger.debug(f'\nArticle(s) fetched.')
-  
-  # Empty list to store paper with at least one author affiliated with 
-  # a pharmaceutical or biotech company 
-  filtered_articles = []  
-  for article in pubmed_articles:
-    article_details = PubmedArticleFetcher()._fetch_article_details(article)
-    # Author affiliated to non-academic institution
-    if article_details and len(article_details["non_academic_authors"]) > 0: 
-      filtered_articles.append(article_details)
-
-  # Construct Dataframe table
-  rows = []
-  for article in filtered_articles:
-    rows.append({
-      "PubmedID": article["pubmed_id"],
-      "Title": article["article_title"],
-      "Publication Date": article["publication_date"],
-      "Non-academic Author(s)": ", ".join(a["name"] for a in article["non_academic_authors"]),
-      "Company Affiliation(s)": ", ".join(article["company_affiliations"]),
-      "Corresponding Author Email": article["corresponding_author_email"] or ""
-    })
-  
-  # Convert to Datafram using Pandas library
-  df = pd.DataFrame(rows)
+  if cache is not None:
+    stats = cache.stats()
+    logger.debug(f"Cache: {stats['hits']} hit(s), {stats['misses']} miss(es), hit rate {stats['hit_rate']:.0%}, "
+                 f"{stats['entries']} response(s) / {stats['size'] / 1024 ** 2:.1f} MiB in {cache.path}")
+    cache.close()
+  if store is not None:
+    store.close()
 
-  # Output results: Save to CSV file 
-  # default to console, if -f/--file flag with file path missing
-  if (args.file):
-    try:
-      logger.debug(f"Saving to {args.file}.csv")
-      df.to_csv(f"{args.file}.csv", index=False)
-      print(f"Result saved to {args.file}.csv")
-    except:
-      logger.error(f"Error: {e}")
-  else: print(df)
+  if output_file:
+    print(f"Result saved to {output_file}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,277 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+# Stages of the pipeline, in order
+STAGES = ('rate_limit', 'network', 'parse', 'classify', 'write')
+
+def _percentile(values: List[float], percent: float) -> float:
+  if not values:
+    return 0.0
+  values = sorted(values)
+  return values[min(len(values) - 1, round(percent / 100 * (len(values) - 1)))]
+
+class _Timer:
+  """
+  Timer of a pipeline stage, see `Metrics.timer`.
+
+  Timers started while another one is running on the same thread pause it, so the time of each
+  stage excludes the nested stages: e.g. the time spent reading a streamed response while parsing
+  it is counted as network time, not parse time.
+  """
+  __slots__ = ('_metrics', 'stage', '_started')
+
+  def __init__(self, metrics: "Metrics", stage: str):
+    self._metrics = metrics
+    self.stage = stage
+    self._started = None
+
+  def start(self) -> None:
+    stack = self._metrics._stack()
+    now = time.perf_counter()
+    if stack:
+      stack[-1]._pause(now)
+    stack.append(self)
+    self._started = now
+
+  def stop(self) -> None:
+    if self._started is None:
+      return
+    now = time.perf_counter()
+    stack = self._metrics._stack()
+    stack.remove(self)
+    self._metrics._add_time(self.stage, now - self._started, 1)
+    self._started = None
+    if stack:
+      stack[-1]._started = now
+
+  def _pause(self, now: float) -> None:
+    self._metrics._add_time(self.stage, now - self._started, 0)
+
+  def __enter__(self):
+    self.start()
+    return self
+
+  def __exit__(self, *exc_info):
+    self.stop()
+
+class _MeteredReader:
+  """Binary file-like object counting the bytes read from `raw`, and the time spent reading them as network time."""
+  def __init__(self, raw, metrics: "Metrics", endpoint: str):
+    self._raw = raw
+    self._metrics = metrics
+    self._endpoint = endpoint
+
+  def read(self, size: int = -1) -> bytes:
+    with self._metrics.timer('network'):
+      data = self._raw.read(size)
+    self._metrics.increment(f'{self._endpoint}_bytes', len(data))
+    return data
+
+  def __getattr__(self, name):
+    return getattr(self._raw, name)
+
+class Metrics:
+  """
+  Thread-safe timers and counters of a run of the pipeline.
+
+  Stages (see `STAGES`):
+    - rate_limit: waiting for the request rate limiter
+    - network: sending requests, waiting for the responses and retries, and reading streamed bodies
+    - parse: parsing the fetched XML
+    - classify: extracting the article details and classifying the author affiliations
+    - write: writing the result rows
+
+  Stage times are summed over all the threads, so they may exceed the wall time with concurrent fetching.
+  """
+  def __init__(self):
+    self.started = time.time()
+    self._start = time.perf_counter()
+    self._lock = threading.Lock()
+    self._local = threading.local()
+    self._seconds: Dict[str, float] = defaultdict(float)
+    self._calls: Dict[str, int] = Counter()
+    self._counters: Dict[str, int] = Counter()
+    self._requests: Dict[str, dict] = {}
+
+  def _stack(self) -> List[_Timer]:
+    stack = getattr(self._local, 'stack', None)
+    if stack is None:
+      stack = self._local.stack = []
+    return stack
+
+  def _add_time(self, stage: str, seconds: float, calls: int) -> None:
+    with self._lock:
+      self._seconds[stage] += seconds
+      self._calls[stage] += calls
+
+  def timer(self, stage: str) -> _Timer:
+    """
+    Create a timer of a pipeline stage, used as a context manager or with `start()`/`stop()`.
+    Each time the timer is stopped counts as one call of the stage.
+    """
+    return _Timer(self, stage)
+
+  def increment(self, counter: str, value: int = 1) -> None:
+    with self._lock:
+      self._counters[counter] += value
+
+  def record_request(self, endpoint: str, status: int, attempts: int, seconds: float, nbytes: int = 0, cached: bool = False) -> None:
+    """
+    Record an E-utilities request.
+
+    Args:
+      endpoint (str): Name of the E-utility (e.g. esearch, efetch).
+      status (int): HTTP status of the final response.
+      attempts (int): Number of attempts, the retries included.
+      seconds (float): Latency of the request, from sending the first attempt to the headers of the final response.
+      nbytes (int): Size of the body, when it was downloaded up front. Streamed bodies are counted as they are read.
+      cached (bool): Whether the response came from the cache.
+    """
+    with self._lock:
+      request = self._requests.setdefault(
+        endpoint, {'count': 0, 'cached': 0, 'retries': 0, 'statuses': Counter(), 'latencies': []}
+      )
+      request['count'] += 1
+      request['cached'] += cached
+      request['retries'] += attempts - 1
+      request['statuses'][status] += 1
+      if not cached:
+        request['latencies'].append(seconds)
+      self._counters[f'{endpoint}_bytes'] += nbytes
+
+  def meter(self, raw, endpoint: str = 'efetch'):
+    """Wrap the body of a streamed response, to count its bytes and the time spent reading it."""
+    return _MeteredReader(raw, self, endpoint)
+
+  def snapshot(self) -> dict:
+    """
+    Returns:
+      dict: JSON-serializable values of the metrics:
+        - started (float): UNIX time the run started
+        - wall_seconds (float): Time elapsed since the run started
+        - stages (dict): Seconds and calls of each stage
+        - counters (dict): Values of the counters, e.g. articles_parsed, rows_written
+        - requests (dict): Count, cached responses, retries, bytes, statuses and p50/p99 latency in seconds of each E-utility
+    """
+    with self._lock:
+      requests = {
+        endpoint: {
+          'count': request['count'],
+          'cached': request['cached'],
+          'retries': request['retries'],
+          'bytes': self._counters.get(f'{endpoint}_bytes', 0),
+          'statuses': {str(status): count for status, count in sorted(request['statuses'].items())},
+          'latency_p50': _percentile(request['latencies'], 50),
+          'latency_p99': _percentile(request['latencies'], 99),
+        }
+        for endpoint, request in self._requests.items()
+      }
+      return {
+        'started': self.started,
+        'wall_seconds': time.perf_counter() - self._start,
+        'stages': {
+          stage: {'seconds': self._seconds[stage], 'calls': self._calls[stage]}
+          for stage in (*STAGES, *sorted(set(self._seconds).difference(STAGES))) if stage in self._seconds
+        },
+        'counters': {name: value for name, value in sorted(self._counters.items()) if not name.endswith('_bytes')},
+        'requests': requests,
+      }
+
+  def summary(self) -> str:
+    """Human-readable summary of the metrics, as printed by `--stats`."""
+    snapshot = self.snapshot()
+    wall = snapshot['wall_seconds']
+    lines = [f"Total: {wall:.2f}s"]
+    for stage, values in snapshot['stages'].items():
+      lines.append(f"  {stage:<10} {values['seconds']:>9.3f}s {values['seconds'] / wall if wall else 0:>6.1%}  ({values['calls']} call(s))")
+    for endpoint, request in snapshot['requests'].items():
+      statuses = ', '.join(f"{status}: {count}" for status, count in request['statuses'].items())
+      lines.append(
+        f"  {endpoint:<10} {request['count']} request(s) ({statuses}), {request['cached']} cached, {request['retries']} retried, "
+        f"{request['bytes'] / 1024 ** 2:.1f} MiB, latency p50 {request['latency_p50'] * 1000:.0f} ms / p99 {request['latency_p99'] * 1000:.0f} ms"
+      )
+    for counter, value in snapshot['counters'].items():
+      rate = f" ({value / wall:.1f}/s)" if wall else ""
+      lines.append(f"  {counter.replace('_', ' ')}: {value}{rate}")
+    return '\n'.join(lines)
+
+  def to_prometheus(self, prefix: str = 'pubmedfetcher') -> str:
+    """Metrics in the Prometheus text exposition format, e.g. for the node_exporter textfile collector."""
+    snapshot = self.snapshot()
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+      lines.append(f"# HELP {prefix}_{name} {help_text}")
+      lines.append(f"# TYPE {prefix}_{name} {kind}")
+      for labels, value in samples:
+        label_text = ','.join(f'{key}="{label}"' for key, label in labels.items())
+        lines.append(f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}")
+
+    requests = snapshot['requests'].items()
+    metric('run_started_timestamp_seconds', 'gauge', "UNIX time the run started.", [({}, snapshot['started'])])
+    metric('run_duration_seconds', 'gauge', "Wall time of the run.", [({}, snapshot['wall_seconds'])])
+    metric('stage_seconds_total', 'counter', "Time spent in each pipeline stage.",
+           [({'stage': stage}, values['seconds']) for stage, values in snapshot['stages'].items()])
+    metric('requests_total', 'counter', "E-utilities requests, by final status.",
+           [({'endpoint': endpoint, 'status': status}, count) for endpoint, request in requests for status, count in request['statuses'].items()])
+    metric('cached_responses_total', 'counter', "Responses read from the cache.",
+           [({'endpoint': endpoint}, request['cached']) for endpoint, request in requests])
+    metric('request_retries_total', 'counter', "Retried E-utilities requests.",
+           [({'endpoint': endpoint}, request['retries']) for endpoint, request in requests])
+    metric('response_bytes_total', 'counter', "Bytes of the E-utilities responses.",
+           [({'endpoint': endpoint}, request['bytes']) for endpoint, request in requests])
+    metric('request_latency_seconds', 'summary', "Latency of the E-utilities requests.",
+           [({'endpoint': endpoint, 'quantile': quantile}, request[f'latency_p{percent}'])
+            for endpoint, request in requests for quantile, percent in (('0.5', 50), ('0.99', 99))])
+    for counter, value in snapshot['counters'].items():
+      metric(f'{counter}_total', 'counter', f"Number of {counter.replace('_', ' ')}.", [({}, value)])
+    return '\n'.join(lines) + '\n'
+
+  def write(self, path: str) -> None:
+    """
+    Write the metrics to `path`: in the Prometheus text format if it ends with `.prom`, as JSON otherwise.
+
+    The file is replaced atomically, so collectors never read a partially written file.
+    """
+    text = self.to_prometheus() if path.endswith('.prom') else json.dumps(self.snapshot(), indent=2)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+      file.write(text)
+    os.replace(temp_path, path)
+
+class _NullTimer:
+  __slots__ = ()
+
+  def start(self) -> None:
+    pass
+
+  def stop(self) -> None:
+    pass
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    pass
+
+class _NullMetrics:
+  """Metrics which record nothing, used when instrumentation is disabled."""
+  _timer = _NullTimer()
+
+  def timer(self, stage: str) -> _NullTimer:
+    return self._timer
+
+  def increment(self, counter: str, value: int = 1) -> None:
+    pass
+
+  def record_request(self, *args, **kwargs) -> None:
+    pass
+
+  def meter(self, raw, endpoint: str = 'efetch'):
+    return raw
+
+NULL_METRICS = _NullMetrics()
@@ -1,12 +1,31 @@
+import io
 import logging
-from typing import List, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
 import xml.etree.ElementTree
-from pubmedfetcher.pubmed_fetcher.__init__ import _is_academic_affiliation, _extract_email, _request
+from pubmedfetcher.pubmed_fetcher.__init__ import _extract_email, _create_session, _request, _parse_esearch_result, _parse_esummary_result, _fetch_error
+from pubmedfetcher.pubmed_fetcher.classifier import AffiliationClassifier, default_classifier
+from pubmedfetcher.pubmed_fetcher.metrics import NULL_METRICS, Metrics
 
+from pubmedfetcher.pubmed_fetcher.ratelimit import RateLimiter
 from pubmedfetcher.types import Article, Author
 
+# Base URL of the NCBI E-utilities
+EUTILS_URL = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils'
+
 class PubmedArticleFetcher:
-  def __init__(self):
+  def __init__(self, classifier: AffiliationClassifier = None, metrics: Metrics = None):
+    """
+    Args:
+      classifier (AffiliationClassifier, optional): Classifier of the author affiliations.
+        Default: classifier with the default academic and company keywords.
+      metrics (Metrics, optional): Metrics recording the parse and classify time, and the number 
+        of articles parsed. Default: None, not recorded
+    """
+    self.classifier = classifier if classifier is not None else default_classifier
+    self.metrics = metrics if metrics is not None else NULL_METRICS
     self.logger = logging.getLogger(__name__)
   
   def _fetch_publicationDate(self, article_date: xml.etree.ElementTree) -> str:
@@ -16,7 +35,7 @@ class PubmedArticleFetcher:
     Handles date formats in PubMed XML, including incomplete dates like year-only or year-month.
     
     Args:
-      article_date (xml.etree.ElementTree.Element): XML element containing date information
+      article_date (xml.etree.ElementTree.Element): XML element containing date information, or None if missing
       Expected structure:
         <PubDate>
             <Year>YYYY</Year>
@@ -31,10 +50,16 @@ class PubmedArticleFetcher:
         - "YYYY" if only year
         Returns empty string if no valid date components are found.
     """
-    # Safe extraction of data with empty string as default values for text if tag is missing
-    year_text = article_date.find("./Year").text if article_date.find("./Year") is not None else ""
-    month_text = article_date.find("./Month").text if article_date.find("./Month") else ""
-    day_text = article_date.find("./Day").text if article_date.find("./Day") is not None else ""
+    if article_date is None:
+      return ""
+
+    # Read the date components in a single pass over the children, 
+    # with empty string as default values for text if tag is missing
+    year_text = month_text = day_text = ""
+    for component in article_date:
+      if component.tag == "Year": year_text = component.text or ""
+      elif component.tag == "Month": month_text = component.text or ""
+      elif component.tag == "Day": day_text = component.text or ""
     
     # Build date string based on available components
     if year_text and month_text and day_text:
@@ -46,7 +71,32 @@ class PubmedArticleFetcher:
     else:
         return ""
 
-  def _fetch_author_details(self, author: xml.etree.ElementTree) -> Tuple[Author, str, str]:
+  def _fetch_revisionDate(self, date_revised: xml.etree.ElementTree) -> str:
+    """
+    Extract the date a PubMed record was last revised.
+
+    Args:
+      date_revised (xml.etree.ElementTree.Element): The <DateRevised> XML element, or None if missing
+      Expected structure:
+        <DateRevised>
+            <Year>YYYY</Year>
+            <Month>MM</Month>
+            <Day>DD</Day>
+        </DateRevised>
+
+    Returns:
+      str: Date in the "YYYY/MM/DD" format used by the E-utilities date parameters,
+        or empty string if the date is missing.
+    """
+    if date_revised is None:
+      return ""
+
+    year_text = date_revised.findtext("./Year", "")
+    month_text = date_revised.findtext("./Month", "01")
+    day_text = date_revised.findtext("./Day", "01")
+    return f"{year_text}/{month_text}/{day_text}" if year_text else ""
+
+  def _fetch_author_details(self, author: xml.etree.ElementTree) -> Tuple[Optional[Author], str, str]:
     """
     Extract and process author details from a PubMed XML author element.
     
@@ -67,52 +117,50 @@ class PubmedArticleFetcher:
 
     Returns:
       tuple: A tuple containing three elements:
-        1. dict: Author information with the following keys:
+        1. Author: Author information, None if the author is affiliated with academia:
             - name (str): Full name (forename + lastname)
             - affiliation (str): Complete affiliation text
             - email (str): Author's email if found in affiliation
-            - is_academic_affiliation (bool): True if affiliated with academia
+            - is_academic (bool): True if affiliated with academia
         2. str: Company affiliation text if non-academic, empty string otherwise
         3. str: Author's email if non-academic, empty string otherwise
 
     Note:
       - Empty strings are used as default values for missing XML elements
       - Email is extracted from affiliation text using _extract_email helper
-      - Academic status is determined by _is_academic_affiliation helper
+      - Academic status is determined by the affiliation classifier
     """
-    # Extract author affiliation components from XML
-    affiliation = author.find("./AffiliationInfo/Affiliation")
-
-    # Use empty string as default values for text if tag is missing
-    affiliation_text = affiliation.text if affiliation is not None else ""
+    # Extract the author name and first affiliation in a single pass over the children,
+    # with empty string as default values for text if tag is missing
+    author_forename_text = author_lastname_text = affiliation_text = ""
+    affiliation = None
+    for element in author:
+      tag = element.tag
+      if tag == "LastName": author_lastname_text = element.text or ""
+      elif tag == "ForeName": author_forename_text = element.text or ""
+      elif tag == "AffiliationInfo" and affiliation is None:
+        affiliation = element.find("Affiliation")
+        if affiliation is not None: affiliation_text = affiliation.text or ""
 
     # Determine academic status and set the corresponding value
     # Store company affiliation if it's non-academic and email for non-academic authors 
-    is_academic_affiliation = _is_academic_affiliation(affiliation_text)
+    is_academic_affiliation = self.classifier.is_academic(affiliation_text)
 
     if is_academic_affiliation:
-      return {}, '', ''
-
-    # Extract author name components from XML
-    author_forename = author.find("./ForeName")
-    author_lastname = author.find("./LastName")
+      return None, '', ''
 
-    # Use empty string as default values for text if tag is missing
-    author_forename_text = author_forename.text if author_forename is not None else ""
-    author_lastname_text = author_lastname.text if author_lastname is not None else ""
-    
     # Extract email from affiliation text if present
     author_email = _extract_email(affiliation_text) if affiliation_text else ""
 
     company_affiliation = affiliation_text if affiliation_text and not is_academic_affiliation else ""
     corresponding_email = author_email if author_email and not is_academic_affiliation else ""
 
-    return {
-      "name": f"{author_forename_text} {author_lastname_text}".strip(),
-      "affiliation": affiliation_text,
-      "email": author_email,
-      "is_academic_affiliation": is_academic_affiliation
-    }, company_affiliation, corresponding_email
+    return Author(
+      name=f"{author_forename_text} {author_lastname_text}".strip(),
+      affiliation=affiliation_text,
+      email=author_email,
+      is_academic=is_academic_affiliation
+    ), company_affiliation, corresponding_email
 
   def _fetch_article_details(self, article: xml.etree.ElementTree) -> Article:
     """
@@ -122,23 +170,42 @@ class PubmedArticleFetcher:
       article (xml.etree.ElementTree.Element): XML element containing article data
     
     Returns:
-      dict: Dictionary containing the following article metadata:
+      Article: Record containing the following article metadata:
         - pubmed_id (str): PubMed identifier
-        - article_title (str): Title of the article
+        - title (str): Title of the article
         - publication_date (str): Formatted publication date
-        - non_academic_authors (list): List of authors with non-academic affiliations
-            Each author is a dict containing author details
-        - company_affiliations (list): Unique list of company/organization affiliations
+        - non_academic_authors (tuple): Authors with non-academic affiliations
+            Each author is an Author record containing author details
+        - company_affiliations (tuple): Unique company/organization affiliations
         - corresponding_author_email (str): Email of the corresponding author, if available
+        - date_revised (str): Date the record was last revised, in "YYYY/MM/DD" format
     """
 
-    # Extract basic article metadata with fallback to empty string if elements are missing
-    pub_date = self._fetch_publicationDate(article.find(".//PubDate"))
-    pubmed_id = article.find(".//PMID").text if article.find(".//PMID") is not None else ""
-    article_title = article.find(".//ArticleTitle").text if article.find(".//ArticleTitle") is not None else ""
-    
-    # Get all authors listed in the articles
-    authors_list = article.findall("./MedlineCitation/Article/AuthorList/Author")
+    # Gather the article metadata in a single pass over the children of the elements holding it,
+    # without descending into the abstract, MeSH headings or references.
+    # Fallback to empty string if elements are missing.
+    pubmed_id = article_title = ""
+    pub_date_element = date_revised_element = None
+    authors_list = ()
+    for section in article:
+      if section.tag != "MedlineCitation":
+        continue
+      for element in section:
+        tag = element.tag
+        if tag == "PMID": pubmed_id = element.text or ""
+        elif tag == "DateRevised": date_revised_element = element
+        elif tag == "Article":
+          for part in element:
+            tag = part.tag
+            if tag == "ArticleTitle": article_title = part.text or ""
+            elif tag == "AuthorList": authors_list = part
+            elif tag == "Journal":
+              for journal_part in part:
+                if journal_part.tag == "JournalIssue":
+                  pub_date_element = journal_part.find("PubDate")
+
+    pub_date = self._fetch_publicationDate(pub_date_element)
+    date_revised = self._fetch_revisionDate(date_revised_element)
     
     # Process each author's information
     authors: List[Author] = []          # List to store all processed author information
@@ -147,28 +214,143 @@ class PubmedArticleFetcher:
     
     # Extract details for each author
     for author in authors_list:
+      if author.tag != "Author":
+        continue
       author, affiliation, email = self._fetch_author_details(author)
-      if not author:
+      if author is None:
         continue
       authors.append(author)
-      #print("author: ",author)
       if affiliation: company_affiliation.append(affiliation)
       # Store the first email found as the corresponding author's email
       if not corresponding_email and email: corresponding_email = email
 
-    return {
-      'pubmed_id': pubmed_id, 
-      'article_title': article_title,
-      'publication_date': pub_date, 
-      'non_academic_authors': [a for a in authors if not a['is_academic_affiliation']],
-      'company_affiliations': list(set(company_affiliation)),
-      'corresponding_author_email': corresponding_email
-    }
+    return Article(
+      pubmed_id=pubmed_id, 
+      title=article_title,
+      publication_date=pub_date, 
+      non_academic_authors=tuple(a for a in authors if not a.is_academic),
+      company_affiliations=tuple(dict.fromkeys(company_affiliation)),
+      corresponding_author_email=corresponding_email,
+      date_revised=date_revised
+    )
+
+  def _iter_article_details(self, source) -> Iterator[Article]:
+    """
+    Incrementally parse a PubmedArticleSet XML document and yield article details one at a time.
+
+    Each `PubmedArticle` element is processed by `_fetch_article_details` as soon as its closing
+    tag is read and is then cleared from the tree, so memory stays flat no matter how many 
+    articles the document holds.
+
+    Args:
+      source (str or file-like): File name or binary file object containing the PubmedArticleSet,
+        e.g. the raw body of a streamed efetch response.
+
+    Yields:
+      Article: Article details, as returned by `_fetch_article_details`
+
+    Raises:
+      ValueError: If the document is not a PubmedArticleSet, e.g. an efetch error.
+    """
+    # The parse timer is paused while the consumer handles each article
+    parse_timer = self.metrics.timer('parse')
+    parse_timer.start()
+    try:
+      context = iter(xml.etree.ElementTree.iterparse(source, events=("start", "end")))
+      _, root = next(context) # First event is the start of the <PubmedArticleSet> root element
+      if root.tag != "PubmedArticleSet":
+        # Error documents are small, parse the rest to read their message
+        for _ in context: pass
+        raise _fetch_error(root)
+
+      for event, element in context:
+        if event != "end" or element.tag not in ("PubmedArticle", "PubmedBookArticle"):
+          continue
+        if element.tag == "PubmedArticle":
+          with self.metrics.timer('classify'):
+            article = self._fetch_article_details(element)
+          self.metrics.increment('articles_parsed')
+          parse_timer.stop()
+          yield article
+          parse_timer.start()
+        # Drop every processed article still referenced by the root element
+        root.clear()
+    finally:
+      parse_timer.stop()
 
 class EntrezQueries:
-  def __init__(self):
-    self.baseURL='https://eutils.ncbi.nlm.nih.gov/entrez/eutils'
+  def __init__(self, api_key=None, rate_limiter=None, session=None, pool_size=10, timeout=(10, 60), 
+               retries=3, backoff_factor=0.5, gzip=True, cache=None, base_url=EUTILS_URL, metrics=None):
+    """
+    Args:
+      api_key (str, optional): NCBI API key, sent with every request. Raises the request limit 
+        from 3 to 10 requests per second.
+      rate_limiter (RateLimiter, optional): Limiter shared by every request of this client. Share 
+        one instance between clients using the same API key. Default: a limiter matching the NCBI 
+        request limit for `api_key`.
+      session (requests.Session, optional): Session used for every request. Default: a new session
+        with a pool of `pool_size` keep-alive connections, closed by `close()`.
+      pool_size (int): Number of pooled connections of the default session. Default: 10
+      timeout (float or tuple): Connect and read timeouts in seconds of each request. Default: (10, 60)
+      retries (int): Number of retries of a request failing with a connection error, a timeout, or a 
+        429/5xx status, with exponential backoff honoring Retry-After. Default: 3
+      backoff_factor (float): Base delay in seconds between retries. Default: 0.5
+      gzip (bool): Ask for gzip compressed responses with the default session. Default: True
+      cache (ResponseCache, optional): On-disk cache of the responses. Default: None, no caching
+      base_url (str): Base URL of the E-utilities, e.g. of a mirror or a local stand-in. Default: EUTILS_URL
+      metrics (Metrics, optional): Metrics recording every request. Default: None, not recorded
+    """
+    self.baseURL=base_url.rstrip('/')
     self.endpoint_suffix='fcgi'
+    self.api_key = api_key
+    self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter.for_api_key(api_key)
+    self._owns_session = session is None
+    self.session = session if session is not None else _create_session(pool_size, gzip)
+    self.timeout = timeout
+    self.retries = retries
+    self.backoff_factor = backoff_factor
+    self.cache = cache
+    self.metrics = metrics if metrics is not None else NULL_METRICS
+    self.logger = logging.getLogger(__name__)
+
+  def close(self):
+    """Close the connections of the session created by this client."""
+    if self._owns_session:
+      self.session.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  def _query(self, endpoint, payload, stream=False, use_cache=True):
+    """
+    Send a request to an E-utility endpoint, within the NCBI request limits.
+
+    Args:
+      endpoint (str): Name of the E-utility (e.g. esearch, efetch).
+      payload (dict): Query parameters of the request.
+      stream (bool): Defer downloading the response body. See `_request`. Default: False
+      use_cache (bool): Read and store the response in the response cache of the client. Default: True
+
+    Returns:
+      requests.Response: The successful response.
+
+    Raises:
+      requests.HTTPError: If the E-utility returned an error status.
+    """
+    if self.api_key:
+      payload = {**payload, 'api_key': self.api_key}
+
+    url = f'{self.baseURL}/{endpoint}.{self.endpoint_suffix}'
+    response = _request(
+      url, payload, stream=stream, rate_limiter=self.rate_limiter, session=self.session, 
+      timeout=self.timeout, retries=self.retries, backoff_factor=self.backoff_factor, 
+      cache=self.cache if use_cache else None, metrics=self.metrics
+    )
+    response.raise_for_status()
+    return response
 
   def entrezInfo(self, **kwargs):
     """
@@ -185,9 +367,7 @@ class EntrezQueries:
     endpoint = 'einfo'
     payload = {}
     payload.update(kwargs)
-    url = f'{self.baseURL}/{endpoint}.{self.endpoint_suffix}'
-    response = _request(url, payload)
-    response.raise_for_status()
+    response = self._query(endpoint, payload)
     return response.text
 
   def entrezSearch(self, db='pubmed', term=None, **kwargs):
@@ -206,9 +386,7 @@ class EntrezQueries:
       'term': term 
     }
     payload.update(kwargs)
-    url = f'{self.baseURL}/{endpoint}.{self.endpoint_suffix}'
-    response = _request(url, payload)
-    response.raise_for_status()
+    response = self._query(endpoint, payload)
     return response.text
 
   def entrezSummary(self, db='pubmed', id=None, **kwargs):
@@ -236,12 +414,10 @@ class EntrezQueries:
         payload.update({'id': id})
 
     payload.update(kwargs)
-    url = f'{self.baseURL}/{endpoint}.{self.endpoint_suffix}'
-    response = _request(url, payload)
-    response.raise_for_status()
+    response = self._query(endpoint, payload)
     return response.text
 
-  def entrezFetch(self, db='pubmed', id=None, **kwargs):
+  def entrezFetch(self, db='pubmed', id=None, stream=False, use_cache=True, **kwargs):
     """
     EntrezFetch retrieve formatted data records in the requested format for a list of input UIDs 
     or for a set of UIDs stored on the Entrez History server.
@@ -253,9 +429,14 @@ class EntrezQueries:
       db (type: str) (default = pubmed)  : Database from which to retrieve DocSums. The value must be a valid Entrez database name.
       id (type: list) : UID list. Either a single UID or a comma-delimited list of UIDs may be provided. All of the UIDs must be from the database specified by db\n
         Required Parameter - Used only when input is from a UID list
+      stream (type: bool) (default = False) : Return the response body as a file-like object that is read
+        incrementally, instead of downloading it as a single string.
+      use_cache (type: bool) (default = True) : Use the response cache of the client. Disable it to fetch 
+        the current version of records known to have been revised.
 
     Returns:
-      Formatted data records as specified
+      Formatted data records as specified.
+      If `stream` is True, a binary file-like object of the (decompressed) response body.
     """
     endpoint = 'efetch'
     payload = {
@@ -266,7 +447,251 @@ class EntrezQueries:
         payload.update({'id': id})
 
     payload.update(kwargs)
-    url = f'{self.baseURL}/{endpoint}.{self.endpoint_suffix}'
-    response = _request(url, payload)
-    response.raise_for_status()
+    response = self._query(endpoint, payload, stream=stream, use_cache=use_cache)
+    if stream:
+      response.raw.decode_content = True
+      return self.metrics.meter(response.raw, endpoint)
     return response.text
+
+  def entrezSearchIds(self, db='pubmed', term=None, max_records=None, page_size=10000, **kwargs):
+    """
+    Search the database and retrieve the UIDs of every matching record, paging through the results.
+
+    Args:
+      db (type: str) (default = pubmed) : Database to search. The value must be a valid Entrez database name.
+      term (type: str) : Entrez text query.
+      max_records (type: int) (default = None) : Maximum number of UIDs to retrieve. All matching UIDs if None.
+      page_size (type: int) (default = 10000) : Number of UIDs retrieved per esearch request (max 10,000).
+      **kwargs : Additional esearch parameters (e.g. sort, datetype, mindate, maxdate).
+
+    Returns:
+      list: UIDs matching the query, in the order returned by esearch
+
+    Note:
+      esearch only gives access to the first 10,000 UIDs of a PubMed search. Use entrezFetchPages
+      to retrieve the records of larger result sets through the History Server.
+    """
+    ids = []
+    while max_records is None or len(ids) < max_records:
+      retmax = page_size if max_records is None else min(page_size, max_records - len(ids))
+      search = _parse_esearch_result(self.entrezSearch(db=db, term=term, retstart=len(ids), retmax=retmax, **kwargs))
+      ids.extend(search['ids'])
+      if not search['ids'] or len(ids) >= search['count']:
+        break
+    return ids
+
+  def entrezHistoryIds(self, db='pubmed', term=None, max_records=None, page_size=10000, search_params=None, search=None):
+    """
+    Search the database and retrieve the UIDs of every matching record in pages through the Entrez History Server.
+
+    Unlike entrezSearchIds, which pages through esearch, the UIDs are listed with efetch (`rettype=uilist`)
+    against the WebEnv/query_key of the search, so result sets larger than 10,000 records can be listed.
+    The pages are retrieved lazily as the generator is consumed.
+
+    Args:
+      db (type: str) (default = pubmed) : Database to search. The value must be a valid Entrez database name.
+      term (type: str) : Entrez text query.
+      max_records (type: int) (default = None) : Maximum number of UIDs to retrieve. All matching UIDs if None.
+      page_size (type: int) (default = 10000) : Number of UIDs retrieved per efetch request (max 10,000).
+      search_params (type: dict) (default = None) : Additional esearch parameters (e.g. sort, datetype, mindate).
+      search (type: dict) (default = None) : A `usehistory=y` search, see `_parse_esearch_result`, whose UIDs to
+        list instead of searching `term`. See entrezSearchHistory.
+
+    Yields:
+      str: UIDs matching the query, in the order of the search results
+    """
+    if search is None:
+      search_params = dict(search_params or {})
+      search_params.update({'usehistory': 'y', 'retmax': 0})
+      search = _parse_esearch_result(self.entrezSearch(db=db, term=term, **search_params))
+
+    total = search['count'] if max_records is None else min(search['count'], max_records)
+    self.logger.debug(f"Found {search['count']} record(s), listing {total} UIDs in pages of {page_size}.")
+
+    for retstart in range(0, total, page_size):
+      yield from self.entrezFetch(
+        db=db, WebEnv=search['webenv'], query_key=search['query_key'], retstart=retstart,
+        retmax=min(page_size, total - retstart), rettype='uilist', retmode='text'
+      ).split()
+
+  def entrezFetchIds(self, ids, db='pubmed', batch_size=500, stream=False, concurrency=1, prefetch=False, **kwargs):
+    """
+    Fetch the records of a list of UIDs in batches.
+
+    The UIDs are consumed lazily, one batch at a time, so they can be streamed from a file of any size.
+    Batches of 200 UIDs or more are sent with HTTP POST, see `_request`.
+
+    Args:
+      ids (iterable) : UIDs of the records to fetch.
+      db (type: str) (default = pubmed) : Database from which to retrieve the records.
+      batch_size (type: int) (default = 500) : Number of records to retrieve per efetch request.
+      stream (type: bool) (default = False) : Yield each batch as a file-like object. See entrezFetch.
+      concurrency (type: int) (default = 1) : Number of batches fetched in parallel.
+      prefetch (type: bool) (default = False) : Fetch the next batch while the current one is consumed. See `_fetch_pages`.
+      **kwargs : Additional efetch parameters (e.g. rettype, retmode), or `use_cache`. See entrezFetch.
+
+    Yields:
+      Formatted data records of each batch, as returned by entrezFetch
+    """
+    ids = iter(ids)
+    pages = ({'id': batch} for batch in iter(lambda: list(islice(ids, batch_size)), []))
+    yield from self._fetch_pages(pages, db=db, stream=stream, concurrency=concurrency, prefetch=prefetch, **kwargs)
+
+  def entrezSearchHistory(self, db='pubmed', webenv=None, query_key=None):
+    """
+    Look up a search stored on the Entrez History Server, e.g. to resume fetching its records.
+
+    Searches `#<query_key>` within the WebEnv, which matches the stored result set if it is still available.
+
+    Args:
+      db (type: str) (default = pubmed) : Database of the stored search.
+      webenv (type: str) : Web environment of the stored search.
+      query_key (type: str) : Query key of the stored search.
+
+    Returns:
+      dict: The search, see `_parse_esearch_result`, or None if the WebEnv has expired
+    """
+    import requests
+
+    try:
+      return _parse_esearch_result(self.entrezSearch(db=db, term=f'#{query_key}', WebEnv=webenv, usehistory='y', retmax=0))
+    except (ValueError, requests.HTTPError) as e:
+      self.logger.debug(f"Search #{query_key} of WebEnv {webenv} is not available: {e}")
+      return None
+
+  def entrezFetchPages(self, db='pubmed', term=None, batch_size=500, max_records=None, search_params=None, stream=False, concurrency=1,
+                       search=None, start=0, **kwargs):
+    """
+    Search the database and fetch every matching record in pages through the Entrez History Server.
+
+    Runs entrezSearch with `usehistory=y` so the result set is stored on the History Server, then 
+    retrieves it with entrezFetch in `retstart`/`retmax` chunks against the returned WebEnv/query_key.
+    Pages are fetched lazily as the generator is consumed, see `_fetch_pages`.
+
+    See the online documentation for an explanation of the History Server:
+    https://www.ncbi.nlm.nih.gov/books/NBK25497/#chapter1.Storing_Search_Results
+
+    Args:
+      db (type: str) (default = pubmed) : Database to search. The value must be a valid Entrez database name.
+      term (type: str) : Entrez text query.
+      batch_size (type: int) (default = 500) : Number of records to retrieve per efetch request (max 10,000).
+      max_records (type: int) (default = None) : Maximum number of records to retrieve. All matching records if None.
+      search_params (type: dict) (default = None) : Additional esearch parameters (e.g. sort, datetype, mindate).
+      stream (type: bool) (default = False) : Yield each page as a file-like object. See entrezFetch.
+      concurrency (type: int) (default = 1) : Number of pages fetched in parallel.
+      search (type: dict) (default = None) : A `usehistory=y` search, see `_parse_esearch_result`, whose records to
+        fetch instead of searching `term`, e.g. to resume a job. See entrezSearchHistory.
+      start (type: int) (default = 0) : Offset of the first record to fetch within the search results.
+      **kwargs : Additional efetch parameters (e.g. rettype, retmode).
+
+    Yields:
+      Formatted data records of each page, as returned by entrezFetch
+    """
+    if search is None:
+      search_params = dict(search_params or {})
+      search_params.update({'usehistory': 'y', 'retmax': 0})
+      search = _parse_esearch_result(self.entrezSearch(db=db, term=term, **search_params))
+
+    total = search['count'] if max_records is None else min(search['count'], max_records)
+    self.logger.debug(f"Found {search['count']} record(s), fetching {max(total - start, 0)} from {start} in batches of {batch_size}.")
+
+    pages = (
+      {'WebEnv': search['webenv'], 'query_key': search['query_key'], 'retstart': retstart, 'retmax': min(batch_size, total - retstart)}
+      for retstart in range(start, total, batch_size)
+    )
+    yield from self._fetch_pages(pages, db=db, stream=stream, concurrency=concurrency, **kwargs)
+
+  def entrezSummaryPages(self, db='pubmed', term=None, batch_size=5000, max_records=None, search_params=None, **kwargs):
+    """
+    Search the database and retrieve the document summaries (DocSums) of every matching record in pages 
+    through the Entrez History Server, like entrezFetchPages does with the full records.
+
+    Args:
+      db (type: str) (default = pubmed) : Database to search. The value must be a valid Entrez database name.
+      term (type: str) : Entrez text query.
+      batch_size (type: int) (default = 5000) : Number of DocSums to retrieve per esummary request (max 10,000).
+      max_records (type: int) (default = None) : Maximum number of DocSums to retrieve. All matching records if None.
+      search_params (type: dict) (default = None) : Additional esearch parameters (e.g. sort, datetype, mindate).
+      **kwargs : Additional esummary parameters.
+
+    Yields:
+      dict: DocSum of each record, see `_parse_esummary_result`, in the order of the search results
+    """
+    search_params = dict(search_params or {})
+    search_params.update({'usehistory': 'y', 'retmax': 0})
+    search = _parse_esearch_result(self.entrezSearch(db=db, term=term, **search_params))
+
+    total = search['count'] if max_records is None else min(search['count'], max_records)
+    self.logger.debug(f"Found {search['count']} record(s), summarizing {total} in batches of {batch_size}.")
+
+    for retstart in range(0, total, batch_size):
+      yield from _parse_esummary_result(self.entrezSummary(
+        db=db, WebEnv=search['webenv'], query_key=search['query_key'], retstart=retstart, 
+        retmax=min(batch_size, total - retstart), retmode='json', **kwargs
+      ))
+
+  def entrezSummaryIds(self, ids, db='pubmed', batch_size=5000, **kwargs):
+    """
+    Retrieve the document summaries (DocSums) of a list of UIDs in batches.
+
+    The UIDs are consumed lazily, one batch at a time, like by entrezFetchIds.
+
+    Args:
+      ids (iterable) : UIDs of the records to summarize.
+      db (type: str) (default = pubmed) : Database from which to retrieve the DocSums.
+      batch_size (type: int) (default = 5000) : Number of DocSums to retrieve per esummary request (max 10,000).
+      **kwargs : Additional esummary parameters.
+
+    Yields:
+      dict: DocSum of each record, see `_parse_esummary_result`
+    """
+    ids = iter(ids)
+    for batch in iter(lambda: list(islice(ids, batch_size)), []):
+      yield from _parse_esummary_result(self.entrezSummary(db=db, id=batch, retmode='json', **kwargs))
+
+  def _fetch_pages(self, pages, stream=False, concurrency=1, prefetch=False, **kwargs):
+    """
+    Fetch a sequence of efetch requests and yield their results in order.
+
+    With a `concurrency` of 1, each page is requested only when the previous one has been consumed,
+    so a streamed page is parsed while it is being downloaded. Otherwise, or with `prefetch`, pages are
+    fetched by a pool of worker threads sharing the client rate limiter, with at most `2 * concurrency` 
+    pages requested ahead of the consumer to keep memory bounded. The next pages are then downloaded
+    while the consumer is still parsing the current one.
+
+    Args:
+      pages (iterable of dict): efetch parameters specific to each page (e.g. id, or retstart/retmax).
+      stream (bool): Yield each page as a binary file-like object. Pages fetched concurrently are
+        downloaded in full by the workers and yielded as in-memory files. Default: False
+      concurrency (int): Number of pages fetched in parallel. Default: 1
+      prefetch (bool): Fetch the next page on a worker thread even with a `concurrency` of 1. Default: False
+      **kwargs: efetch parameters shared by every page (e.g. db, rettype, retmode).
+
+    Yields:
+      Formatted data records of each page, as returned by entrezFetch
+    """
+    concurrency = max(concurrency, 1)
+    if concurrency == 1 and not prefetch:
+      for page in pages:
+        yield self.entrezFetch(stream=stream, **page, **kwargs)
+      return
+
+    def fetch(page):
+      if stream:
+        return io.BytesIO(self.entrezFetch(stream=True, **page, **kwargs).read())
+      return self.entrezFetch(**page, **kwargs)
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='efetch') as executor:
+      try:
+        for page in pages:
+          pending.append(executor.submit(fetch, page))
+          # Wait for the oldest page once enough requests are in flight
+          if len(pending) >= 2 * concurrency:
+            yield pending.popleft().result()
+        while pending:
+          yield pending.popleft().result()
+      finally:
+        # Do not download pages nobody will consume (consumer stopped early or a page failed)
+        for future in pending:
+          future.cancel()
@@ -0,0 +1,163 @@
+import re
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List
+import xml.etree.ElementTree
+
+from pubmedfetcher.pubmed_fetcher.__init__ import _fetch_error
+from pubmedfetcher.pubmed_fetcher.classifier import AffiliationClassifier
+from pubmedfetcher.pubmed_fetcher.metrics import NULL_METRICS, Metrics
+from pubmedfetcher.pubmed_fetcher.modules import PubmedArticleFetcher
+from pubmedfetcher.types import Article
+
+# Opening tag of an article. `<PubmedArticleSet>` shares the prefix, hence the delimiter.
+_ARTICLE_START = re.compile(rb'<PubmedArticle[\s>]')
+_ARTICLE_END = b'</PubmedArticle>'
+# Opening tag of the root element, following the XML declaration and the DOCTYPE
+_ROOT_START = re.compile(rb'<([A-Za-z_][\w.:-]*)[\s/>]')
+
+# Article fetcher of a worker process, created by `_init_worker`
+_article_fetcher = None
+
+def _init_worker(academic_keywords, company_keywords) -> None:
+  """Create the article fetcher of a worker process, with the same keywords as the parent's classifier."""
+  global _article_fetcher
+  _article_fetcher = PubmedArticleFetcher(AffiliationClassifier(academic_keywords, company_keywords))
+
+def _parse_fragments(fragments: List[bytes]) -> List[Article]:
+  """Parse a chunk of `<PubmedArticle>` XML fragments in a worker process."""
+  return [_article_fetcher._fetch_article_details(xml.etree.ElementTree.fromstring(fragment)) for fragment in fragments]
+
+def _iter_article_fragments(source, read_size=1 << 16) -> Iterator[bytes]:
+  """
+  Split a PubmedArticleSet XML document into the raw XML of its `<PubmedArticle>` elements.
+
+  The document is scanned for the article tags without being parsed, which is much cheaper
+  than parsing it in the parent process only to serialize each article again for the workers.
+
+  Args:
+    source (str or file-like): File name or binary file object containing the PubmedArticleSet.
+    read_size (int): Number of bytes read from `source` at a time. Default: 64 KiB
+
+  Yields:
+    bytes: XML of each `<PubmedArticle>` element, in document order
+
+  Raises:
+    ValueError: If the document is not a PubmedArticleSet, e.g. an efetch error.
+  """
+  if isinstance(source, str):
+    with open(source, 'rb') as file:
+      yield from _iter_article_fragments(file, read_size)
+    return
+
+  buffer = bytearray()
+  root_checked = False
+  while True:
+    data = source.read(read_size)
+    buffer += data
+
+    if not root_checked:
+      root = _ROOT_START.search(buffer)
+      if root is None and data:
+        continue
+      if root is None or root.group(1) != b'PubmedArticleSet':
+        # Error documents are small, parse them in full to read their message
+        raise _fetch_error(xml.etree.ElementTree.fromstring(bytes(buffer) + source.read()))
+      root_checked = True
+
+    position = 0
+    while (start := _ARTICLE_START.search(buffer, position)) is not None:
+      end = buffer.find(_ARTICLE_END, start.start())
+      if end < 0:
+        break
+      position = end + len(_ARTICLE_END)
+      yield bytes(buffer[start.start():position])
+
+    if not data:
+      return
+
+    # Keep the incomplete article, or the bytes which may hold the beginning of the next opening tag
+    keep_from = start.start() if start is not None else max(position, len(buffer) - len(_ARTICLE_END))
+    del buffer[:keep_from]
+
+class ArticleParserPool:
+  """
+  Parse PubmedArticleSet documents on a pool of worker processes.
+
+  Raw article XML fragments are sent to the workers in chunks and the parsed articles are
+  yielded in document order, so the results are identical to those of `PubmedArticleFetcher`.
+  """
+  def __init__(self, workers: int, classifier: AffiliationClassifier = None, chunk_size: int = 100, metrics: Metrics = None):
+    """
+    Args:
+      workers (int): Number of worker processes.
+      classifier (AffiliationClassifier, optional): Classifier whose keywords are used by the workers.
+        Default: classifier with the default keywords.
+      chunk_size (int): Number of articles sent to a worker at a time. Default: 100
+      metrics (Metrics, optional): Metrics recording the time spent splitting the documents and waiting 
+        for the workers as parse time, and the number of articles parsed. Default: None, not recorded
+    """
+    classifier = classifier if classifier is not None else AffiliationClassifier()
+    self.workers = workers
+    self.chunk_size = chunk_size
+    self.metrics = metrics if metrics is not None else NULL_METRICS
+    # Spawn the workers, forking is unsafe once the fetching threads are running
+    self._executor = ProcessPoolExecutor(
+      max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+      initializer=_init_worker, initargs=(classifier.academic_keywords, classifier.company_keywords)
+    )
+
+  def _iter_chunks(self, source) -> Iterator[List[bytes]]:
+    chunk = []
+    for fragment in _iter_article_fragments(source):
+      chunk.append(fragment)
+      if len(chunk) == self.chunk_size:
+        yield chunk
+        chunk = []
+    if chunk:
+      yield chunk
+
+  def _iter_article_details(self, source) -> Iterator[Article]:
+    """
+    Parse a PubmedArticleSet XML document on the worker processes and yield article details one at a time.
+
+    At most `2 * workers` chunks are parsed ahead of the consumer, to keep memory bounded.
+
+    Args:
+      source (str or file-like): File name or binary file object containing the PubmedArticleSet.
+
+    Yields:
+      Article: Article details, as returned by `PubmedArticleFetcher._fetch_article_details`, in document order
+    """
+    pending = deque()
+    # The parse timer is paused while the consumer handles the articles
+    parse_timer = self.metrics.timer('parse')
+    parse_timer.start()
+    try:
+      for chunk in self._iter_chunks(source):
+        pending.append(self._executor.submit(_parse_fragments, chunk))
+        if len(pending) >= 2 * self.workers:
+          yield from self._yield_parsed(pending.popleft(), parse_timer)
+      while pending:
+        yield from self._yield_parsed(pending.popleft(), parse_timer)
+    finally:
+      parse_timer.stop()
+      for future in pending:
+        future.cancel()
+
+  def _yield_parsed(self, future, parse_timer) -> Iterator[Article]:
+    articles = future.result()
+    self.metrics.increment('articles_parsed', len(articles))
+    parse_timer.stop()
+    yield from articles
+    parse_timer.start()
+
+  def close(self) -> None:
+    self._executor.shutdown(cancel_futures=True)
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
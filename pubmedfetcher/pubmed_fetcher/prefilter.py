@@ -0,0 +1,96 @@
+import logging
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+_YEAR = re.compile(r'\b(\d{4})\b')
+
+class DocSumFilter:
+  """
+  Filter of PubMed records on their document summary (DocSum), as returned by esummary.
+
+  DocSums are a small fraction of the size of the full efetch records, so filtering on them
+  first avoids downloading and parsing the records which can be excluded on their publication
+  date, publication type or journal alone.
+  """
+  def __init__(self, min_year: Optional[int] = None, max_year: Optional[int] = None, publication_types: Iterable[str] = (),
+               exclude_publication_types: Iterable[str] = (), journals: Iterable[str] = ()):
+    """
+    Args:
+      min_year (int, optional): Keep the records published this year or later. Default: None, no lower bound
+      max_year (int, optional): Keep the records published this year or earlier. Default: None, no upper bound
+      publication_types (iterable of str): Keep the records with at least one of these publication types
+        (e.g. "Journal Article", "Clinical Trial"). Default: (), any type
+      exclude_publication_types (iterable of str): Drop the records with any of these publication types
+        (e.g. "Review", "Comment"). Default: ()
+      journals (iterable of str): Keep the records published in one of these journals, matched against the
+        full journal name or its abbreviation. Default: (), any journal
+
+    All the names are matched case-insensitively. Records whose publication year is unknown are kept.
+    """
+    self.min_year = min_year
+    self.max_year = max_year
+    self.publication_types = frozenset(name.lower() for name in publication_types)
+    self.exclude_publication_types = frozenset(name.lower() for name in exclude_publication_types)
+    self.journals = frozenset(name.lower() for name in journals)
+
+  @property
+  def active(self) -> bool:
+    """Whether the filter excludes any record at all."""
+    return any((
+      self.min_year is not None, self.max_year is not None, self.publication_types, self.exclude_publication_types, self.journals
+    ))
+
+  @staticmethod
+  def _year(docsum: Dict[str, Any]) -> Optional[int]:
+    # `pubdate` is free text (e.g. "2024 Dec 15", "2023 Winter"), `sortpubdate` is "YYYY/MM/DD HH:MM"
+    for field in ('pubdate', 'sortpubdate', 'epubdate'):
+      match = _YEAR.search(docsum.get(field) or '')
+      if match:
+        return int(match.group(1))
+    return None
+
+  def matches(self, docsum: Dict[str, Any]) -> bool:
+    """
+    Args:
+      docsum (dict): DocSum of a record, see `_parse_esummary_result`.
+
+    Returns:
+      bool: True if the record should be fetched.
+    """
+    year = self._year(docsum)
+    if year is not None:
+      if self.min_year is not None and year < self.min_year:
+        return False
+      if self.max_year is not None and year > self.max_year:
+        return False
+
+    if self.publication_types or self.exclude_publication_types:
+      types = {name.lower() for name in docsum.get('pubtype') or ()}
+      if self.publication_types and not types & self.publication_types:
+        return False
+      if types & self.exclude_publication_types:
+        return False
+
+    if self.journals:
+      names = {(docsum.get('fulljournalname') or '').lower(), (docsum.get('source') or '').lower()}
+      if not names & self.journals:
+        return False
+    return True
+
+  def filter_ids(self, docsums: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Filter the DocSums lazily, and log how many records were kept once they are all consumed.
+
+    Args:
+      docsums (iterable of dict): DocSums of the records.
+
+    Yields:
+      str: UIDs of the records matching the filter, in order.
+    """
+    total = kept = 0
+    for docsum in docsums:
+      total += 1
+      if self.matches(docsum):
+        kept += 1
+        yield docsum['uid']
+    logging.getLogger(__name__).info(f"{kept} of {total} article(s) kept by the summary prefilter.")
@@ -0,0 +1,101 @@
+import threading
+import time
+
+# Requests per second allowed by NCBI for the E-utilities
+# https://www.ncbi.nlm.nih.gov/books/NBK25497/#chapter2.Usage_Guidelines_and_Requiremen
+NCBI_RATE_LIMIT = 3
+NCBI_API_KEY_RATE_LIMIT = 10
+
+class RateLimiter:
+  """
+  Thread-safe token bucket limiting the rate at which requests are sent.
+
+  Tokens are refilled continuously at `rate` tokens per second, up to `burst` tokens.
+  Every request takes one token and blocks until one is available, so all the threads
+  sharing a limiter together never exceed the configured rate.
+  """
+  def __init__(self, rate: float, burst: int = 1):
+    """
+    Args:
+      rate (float): Number of requests allowed per second.
+      burst (int): Maximum number of requests that may be sent back to back. Default: 1,
+        which spaces requests evenly and never exceeds `rate` requests in any one-second window.
+    """
+    if rate <= 0:
+      raise ValueError("Rate limit must be a positive number of requests per second.")
+
+    self.rate = rate
+    self.burst = burst
+    self._tokens = float(burst)
+    self._updated = time.monotonic()
+    self._lock = threading.Lock()
+
+  @classmethod
+  def for_api_key(cls, api_key=None) -> "RateLimiter":
+    """
+    Create a limiter matching the NCBI request limit: 10 requests/second with an API key, 3 without.
+    """
+    return cls(NCBI_API_KEY_RATE_LIMIT if api_key else NCBI_RATE_LIMIT)
+
+  def acquire(self) -> None:
+    """Block until a request may be sent, then consume a token."""
+    while True:
+      with self._lock:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        if self._tokens >= 1:
+          self._tokens -= 1
+          return
+        # Time until the next token is available
+        wait = (1 - self._tokens) / self.rate
+      time.sleep(wait)
+
+class AsyncRateLimiter:
+  """
+  Token bucket limiting the rate at which requests are sent by coroutines, see `RateLimiter`.
+
+  Waiting coroutines are served in order, and sleep without blocking the event loop. A limiter
+  must only be used from a single event loop.
+  """
+  def __init__(self, rate: float, burst: int = 1):
+    """
+    Args:
+      rate (float): Number of requests allowed per second.
+      burst (int): Maximum number of requests that may be sent back to back. Default: 1
+    """
+    if rate <= 0:
+      raise ValueError("Rate limit must be a positive number of requests per second.")
+
+    import asyncio
+
+    self.rate = rate
+    self.burst = burst
+    self._tokens = float(burst)
+    self._updated = time.monotonic()
+    self._lock = asyncio.Lock()
+
+  @classmethod
+  def for_api_key(cls, api_key=None) -> "AsyncRateLimiter":
+    """
+    Create a limiter matching the NCBI request limit: 10 requests/second with an API key, 3 without.
+    """
+    return cls(NCBI_API_KEY_RATE_LIMIT if api_key else NCBI_RATE_LIMIT)
+
+  def _refill(self) -> None:
+    now = time.monotonic()
+    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+    self._updated = now
+
+  async def acquire(self) -> None:
+    """Wait until a request may be sent, then consume a token."""
+    import asyncio
+
+    # The lock is held while sleeping, so the waiting coroutines take the tokens in turn
+    async with self._lock:
+      self._refill()
+      if self._tokens < 1:
+        await asyncio.sleep((1 - self._tokens) / self.rate)
+        self._refill()
+      self._tokens -= 1
@@ -0,0 +1,142 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import zlib
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from pubmedfetcher.pubmed_fetcher import setup_logging
+from pubmedfetcher.pubmed_fetcher.writers import WRITERS, open_writer, output_path
+from pubmedfetcher.types import ROW_FIELDS
+
+# Column identifying the papers of the outputs
+PMID_FIELD = "PubmedID"
+
+def shard_of(pmid: str, shards: int) -> int:
+  """
+  Return the shard a PMID is assigned to.
+
+  The PMID is hashed with CRC-32, which is stable across processes, machines and Python versions
+  (unlike `hash()`), and spreads consecutive PMIDs evenly over the shards.
+
+  Args:
+    pmid (str): PMID of the paper.
+    shards (int): Number of shards.
+
+  Returns:
+    int: Index of the shard, from 0 to `shards - 1`
+  """
+  return zlib.crc32(str(pmid).strip().encode('ascii')) % shards
+
+def in_shard(ids: Iterable[str], shard: Tuple[int, int]) -> Iterator[str]:
+  """Yield the PMIDs assigned to `shard`, an `(index, count)` pair, lazily and in order."""
+  index, shards = shard
+  return (pmid for pmid in ids if shard_of(pmid, shards) == index)
+
+def parse_shard(value: str) -> Tuple[int, int]:
+  """
+  Parse a `--shard i/N` argument: shard `i` of `N`, numbered from 0.
+
+  Raises:
+    argparse.ArgumentTypeError: If the value is not a valid shard.
+  """
+  try:
+    index, shards = (int(part) for part in value.split('/'))
+  except ValueError:
+    raise argparse.ArgumentTypeError(f"invalid shard {value!r}, expected i/N, e.g. 0/4")
+  if shards < 1 or not 0 <= index < shards:
+    raise argparse.ArgumentTypeError(f"invalid shard {value!r}, i must be between 0 and N-1")
+  return index, shards
+
+def _read_rows(path: str) -> Iterator[Dict[str, str]]:
+  """Read the rows of a csv, jsonl or parquet output, keyed by column name."""
+  extension = os.path.splitext(path)[1]
+  if extension == '.csv':
+    with open(path, newline='', encoding='utf-8') as file:
+      yield from csv.DictReader(file)
+  elif extension == '.jsonl':
+    with open(path, encoding='utf-8') as file:
+      for line in file:
+        if line.strip():
+          yield json.loads(line)
+  elif extension == '.parquet':
+    try:
+      import pyarrow.parquet
+    except ImportError as e:
+      raise ImportError("Reading parquet files requires the `pyarrow` package: pip install 'pubmedfetcher[parquet]'") from e
+    for batch in pyarrow.parquet.ParquetFile(path).iter_batches():
+      yield from batch.to_pylist()
+  else:
+    raise ValueError(f"Unknown output format of {path}, expected a .csv, .jsonl or .parquet file.")
+
+def merge_rows(paths: Iterable[str]) -> Tuple[List[str], List[Dict[str, str]]]:
+  """
+  Merge the rows of the outputs of several shards.
+
+  Every row is held in memory until all the inputs are read, to be deduplicated and sorted, so the
+  merge needs memory in proportion to the total size of the outputs, about five times the size of
+  CSV outputs. Harvests larger than the memory of the host have to be merged with an external sort.
+
+  Args:
+    paths (iterable of str): Output files of the shards, in csv, jsonl or parquet format.
+
+  Returns:
+    tuple: The columns of the outputs, in order of appearance, and their rows deduplicated
+      by PMID, keeping the first row of each paper, in numeric PMID order
+  """
+  logger = logging.getLogger(__name__)
+  fieldnames: Dict[str, None] = {}
+  rows: Dict[str, Dict[str, str]] = {}
+  for path in paths:
+    count = duplicates = 0
+    for row in _read_rows(path):
+      fieldnames.update(dict.fromkeys(row))
+      count += 1
+      if row[PMID_FIELD] in rows:
+        duplicates += 1
+      else:
+        rows[row[PMID_FIELD]] = row
+    logger.debug(f"{count} row(s) read from {path}, {duplicates} duplicate(s).")
+  ordered = sorted(rows, key=lambda pmid: int(pmid) if pmid.isdigit() else float('inf'))
+  return list(fieldnames) or list(ROW_FIELDS), [rows[pmid] for pmid in ordered]
+
+def main():
+  parser = argparse.ArgumentParser(
+    description="""Merge the outputs of the shards of a harvest (get-papers-list --shard i/N) into one file,
+    with one row per paper, ordered by PMID. The rows are merged in memory."""
+  )
+  parser.add_argument("inputs", nargs='+', help="Output files of the shards, in csv, jsonl or parquet format.")
+  parser.add_argument("-f", "--file", default=None, help="Output File name to save the merged result. Default = None, Print the output to the console")
+  parser.add_argument("--format", choices=WRITERS, default=None, help="Output format. Default = format of the -f/--file extension, or csv. Table printed to the console without -f/--file.")
+  parser.add_argument("-d", "--debug", action="store_true", help="Enable debug mode. Print debug Infomation during execution")
+  args = parser.parse_args()
+
+  setup_logging(args.debug)
+  logger = logging.getLogger(__name__)
+
+  # Output results: Save to a file, in the format of its extension by default, or print them to the console
+  if args.file:
+    extension = os.path.splitext(args.file)[1].lstrip('.')
+    output_format = args.format or (extension if extension in WRITERS and extension != 'table' else 'csv')
+    if output_format == 'table':
+      parser.error("the table format is printed to the console and cannot be used with -f/--file")
+    output_file = output_path(args.file, output_format)
+  else:
+    output_format, output_file = args.format or 'table', None
+
+  try:
+    fieldnames, rows = merge_rows(args.inputs)
+    with open_writer(output_format, output_file, fieldnames) as writer:
+      for row in rows:
+        writer.write(row)
+  except Exception as e:
+    logger.error(f"Error: {e}")
+    raise exit(1)
+
+  logger.info(f"{len(rows)} paper(s) merged from {len(args.inputs)} file(s).")
+  if output_file:
+    print(f"Result saved to {output_file}")
+
+if __name__ == "__main__":
+  main()
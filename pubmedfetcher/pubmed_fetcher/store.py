@@ -0,0 +1,98 @@
+import json
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from pubmedfetcher.types import Article
+
+# Maximum number of host parameters in a single SQLite statement
+_SQLITE_MAX_VARIABLES = 900
+
+class ArticleStore:
+  """
+  Local store of parsed article records, keyed by PMID, in a SQLite database.
+
+  Each record is stamped with the `DateRevised` of the PubMed record it was parsed from, and with
+  the fingerprint of the classifier which classified its authors. The store remembers when each 
+  search term was last synchronized, so later runs only have to fetch the records which are new, 
+  were revised since, or were classified with other keywords.
+  """
+  def __init__(self, path: str, classifier: Optional[str] = None):
+    """
+    Args:
+      path (str): Path of the SQLite database file, created if missing.
+      classifier (str, optional): Fingerprint of the classifier of this run, see `AffiliationClassifier.fingerprint`.
+        Records classified by another classifier are reported as missing.
+    """
+    self.path = path
+    self.classifier = classifier
+    self._db = sqlite3.connect(path, timeout=30)
+    self._db.execute(
+      'CREATE TABLE IF NOT EXISTS articles (pmid TEXT PRIMARY KEY, date_revised TEXT, record TEXT, classifier TEXT)'
+    )
+    # Stores created before the classifier was recorded, whose records are all classified again
+    if 'classifier' not in {row[1] for row in self._db.execute('PRAGMA table_info(articles)')}:
+      self._db.execute('ALTER TABLE articles ADD COLUMN classifier TEXT')
+    self._db.execute('CREATE TABLE IF NOT EXISTS syncs (term TEXT PRIMARY KEY, synced_at TEXT)')
+    self._db.commit()
+
+  def _select(self, query: str, pmids: List[str], params: tuple = ()) -> Iterator[tuple]:
+    """
+    Run a `... WHERE pmid IN (?)` query over `pmids`, in chunks fitting the SQLite parameter limit.
+    `params` are the values of the parameters following the PMIDs in the query.
+    """
+    for start in range(0, len(pmids), _SQLITE_MAX_VARIABLES):
+      chunk = pmids[start:start + _SQLITE_MAX_VARIABLES]
+      yield from self._db.execute(query.format(','.join('?' * len(chunk))), (*chunk, *params))
+
+  def missing(self, pmids: Iterable[str]) -> List[str]:
+    """
+    Args:
+      pmids (iterable of str): PMIDs to look up.
+
+    Returns:
+      list: PMIDs without a stored record, or whose record was classified by another classifier, in the order given.
+    """
+    pmids = list(pmids)
+    stored = {
+      row[0] for row in self._select('SELECT pmid FROM articles WHERE pmid IN ({}) AND classifier IS ?', pmids, (self.classifier,))
+    }
+    return [pmid for pmid in pmids if pmid not in stored]
+
+  def get_many(self, pmids: Iterable[str]) -> Iterator[Article]:
+    """
+    Args:
+      pmids (iterable of str): PMIDs of the records to retrieve.
+
+    Yields:
+      Article: Stored article records, in the order of `pmids`. PMIDs without a record are skipped.
+    """
+    pmids = list(pmids)
+    records: Dict[str, str] = dict(self._select('SELECT pmid, record FROM articles WHERE pmid IN ({})', pmids))
+    for pmid in pmids:
+      if pmid in records:
+        yield Article.from_dict(json.loads(records[pmid]))
+
+  def put(self, article: Article) -> None:
+    """Insert or replace the record of an article, classified by the classifier of the store. Changes are saved by `commit()`."""
+    self._db.execute(
+      'INSERT OR REPLACE INTO articles (pmid, date_revised, record, classifier) VALUES (?, ?, ?, ?)',
+      (article.pubmed_id, article.date_revised, json.dumps(article.to_dict()), self.classifier)
+    )
+
+  def last_sync(self, term: str) -> Optional[str]:
+    """
+    Returns:
+      str: Date ("YYYY/MM/DD") `term` was last synchronized, or None if it never was.
+    """
+    row = self._db.execute('SELECT synced_at FROM syncs WHERE term = ?', (term,)).fetchone()
+    return row[0] if row else None
+
+  def set_last_sync(self, term: str, synced_at: str) -> None:
+    """Record the date ("YYYY/MM/DD") `term` was synchronized. Changes are saved by `commit()`."""
+    self._db.execute('INSERT OR REPLACE INTO syncs VALUES (?, ?)', (term, synced_at))
+
+  def commit(self) -> None:
+    self._db.commit()
+
+  def close(self) -> None:
+    self._db.close()
@@ -0,0 +1,181 @@
+import csv
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Sequence
+
+from pubmedfetcher.types import ROW_FIELDS
+
+class RowWriter:
+  """
+  Base class of the output writers, which write result rows as soon as they are produced.
+
+  Writers are context managers: the output is flushed and closed on exit.
+  """
+  # Extension appended to output file names missing it
+  extension = ''
+  # Whether the writer can append rows to an existing output file
+  appendable = False
+
+  def __init__(self, path: Optional[str] = None, fieldnames: Sequence[str] = ROW_FIELDS, append: bool = False):
+    """
+    Args:
+      path (str, optional): Output file path. Default: None, write to the console (stdout).
+      fieldnames (sequence of str): Columns of the rows, in order. Default: ROW_FIELDS
+      append (bool): Append the rows to the output file instead of overwriting it, e.g. to resume
+        an interrupted job. Only supported by the `appendable` writers. Default: False
+    """
+    if append and not self.appendable:
+      raise ValueError(f"{type(self).__name__} cannot append to an existing output file.")
+    self.path = path
+    self.fieldnames = list(fieldnames)
+    self.rows_written = 0
+
+  def write(self, row: Dict[str, str]) -> None:
+    """Write a row, keyed by column name."""
+    raise NotImplementedError
+
+  def flush(self) -> None:
+    """Write the rows written so far through to the output file, e.g. before recording a checkpoint."""
+    pass
+
+  def close(self) -> None:
+    pass
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+class _TextRowWriter(RowWriter):
+  """Base class of the writers of text formats, writing to a file or stdout."""
+  appendable = True
+
+  def __init__(self, path: Optional[str] = None, fieldnames: Sequence[str] = ROW_FIELDS, append: bool = False):
+    super().__init__(path, fieldnames, append)
+    self._file = open(path, 'a' if append else 'w', newline='', encoding='utf-8') if path else sys.stdout
+
+  def flush(self) -> None:
+    self._file.flush()
+    if self._file is not sys.stdout:
+      os.fsync(self._file.fileno())
+
+  def close(self) -> None:
+    if self._file is sys.stdout:
+      self._file.flush()
+    else:
+      self._file.close()
+
+class CsvWriter(_TextRowWriter):
+  """Write rows as CSV, with a header row, using the csv module."""
+  extension = '.csv'
+
+  def __init__(self, path: Optional[str] = None, fieldnames: Sequence[str] = ROW_FIELDS, append: bool = False):
+    super().__init__(path, fieldnames, append)
+    self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, lineterminator='\n')
+    # Rows appended to an existing file follow its header
+    if not append or self._file.tell() == 0:
+      self._writer.writeheader()
+
+  def write(self, row: Dict[str, str]) -> None:
+    self._writer.writerow(row)
+    self.rows_written += 1
+
+class JsonlWriter(_TextRowWriter):
+  """Write rows as JSON Lines, one JSON object per row."""
+  extension = '.jsonl'
+
+  def write(self, row: Dict[str, str]) -> None:
+    self._file.write(json.dumps({name: row.get(name, "") for name in self.fieldnames}, ensure_ascii=False))
+    self._file.write('\n')
+    self.rows_written += 1
+
+class ParquetWriter(RowWriter):
+  """
+  Write rows to a Parquet file, in row groups of `row_group_size` rows.
+
+  Requires the optional `pyarrow` package.
+  """
+  extension = '.parquet'
+
+  def __init__(self, path: Optional[str] = None, fieldnames: Sequence[str] = ROW_FIELDS, append: bool = False, row_group_size: int = 10000):
+    if not path:
+      raise ValueError("The parquet format requires an output file (-f/--file).")
+    try:
+      import pyarrow
+      import pyarrow.parquet
+    except ImportError as e:
+      raise ImportError("The parquet format requires the `pyarrow` package: pip install 'pubmedfetcher[parquet]'") from e
+
+    super().__init__(path, fieldnames, append)
+    self._pyarrow = pyarrow
+    self._schema = pyarrow.schema([(name, pyarrow.string()) for name in self.fieldnames])
+    self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+    self._row_group_size = row_group_size
+    self._rows: List[Dict[str, str]] = []
+
+  def write(self, row: Dict[str, str]) -> None:
+    self._rows.append(row)
+    self.rows_written += 1
+    if len(self._rows) >= self._row_group_size:
+      self._flush()
+
+  def _flush(self) -> None:
+    if self._rows:
+      self._writer.write_table(self._pyarrow.Table.from_pylist(self._rows, schema=self._schema))
+      self._rows = []
+
+  def close(self) -> None:
+    self._flush()
+    self._writer.close()
+
+class TableWriter(RowWriter):
+  """
+  Print the rows to the console as a table once all of them are written.
+
+  Uses pandas to format the table when it is installed, and falls back to CSV otherwise.
+  """
+  def __init__(self, path: Optional[str] = None, fieldnames: Sequence[str] = ROW_FIELDS, append: bool = False):
+    super().__init__(None, fieldnames, append)
+    self._rows: List[Dict[str, str]] = []
+
+  def write(self, row: Dict[str, str]) -> None:
+    self._rows.append(row)
+    self.rows_written += 1
+
+  def close(self) -> None:
+    try:
+      import pandas as pd
+    except ImportError:
+      with CsvWriter(None, self.fieldnames) as writer:
+        for row in self._rows: writer.write(row)
+      return
+    print(pd.DataFrame(self._rows, columns=self.fieldnames))
+
+WRITERS = {
+  'csv': CsvWriter,
+  'jsonl': JsonlWriter,
+  'parquet': ParquetWriter,
+  'table': TableWriter,
+}
+
+def output_path(file: str, output_format: str) -> str:
+  """Append the extension of `output_format` to the output file name, unless it already ends with it."""
+  extension = WRITERS[output_format].extension
+  return file if file.endswith(extension) else f"{file}{extension}"
+
+def open_writer(output_format: str, path: Optional[str] = None, fieldnames: Sequence[str] = ROW_FIELDS, append: bool = False) -> RowWriter:
+  """
+  Create the writer of an output format.
+
+  Args:
+    output_format (str): One of `WRITERS`: csv, jsonl, parquet or table.
+    path (str, optional): Output file path. Default: None, write to the console.
+    fieldnames (sequence of str): Columns of the rows, in order. Default: ROW_FIELDS
+    append (bool): Append to the output file instead of overwriting it (csv and jsonl only). Default: False
+
+  Returns:
+    RowWriter: The writer, to be used as a context manager.
+  """
+  return WRITERS[output_format](path, fieldnames, append)
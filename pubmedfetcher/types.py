@@ -1,16 +1,48 @@
-from typing import TypedDict, List, Optional, Dict, Any
-from datetime import date
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple
 
-class Author(TypedDict):
+@dataclass(frozen=True, slots=True)
+class Author:
   name: str
   affiliation: Optional[str]
   email: Optional[str]
   is_academic: bool
 
-class Article(TypedDict):
+@dataclass(frozen=True, slots=True)
+class Article:
   pubmed_id: str
   title: str
-  publication_date: date
-  non_academic_authors: List[Author]
-  company_affiliations: List[str]
-  corresponding_author_email: Optional[str]
\ No newline at end of file
+  publication_date: str
+  non_academic_authors: Tuple[Author, ...]
+  company_affiliations: Tuple[str, ...]
+  corresponding_author_email: Optional[str]
+  date_revised: str = ""
+
+  def to_row(self) -> Dict[str, str]:
+    """Convert the article to a row of the results table, keyed by column name."""
+    return {
+      "PubmedID": self.pubmed_id,
+      "Title": self.title,
+      "Publication Date": self.publication_date,
+      "Non-academic Author(s)": ", ".join(author.name for author in self.non_academic_authors),
+      "Company Affiliation(s)": ", ".join(self.company_affiliations),
+      "Corresponding Author Email": self.corresponding_author_email or ""
+    }
+
+  def to_dict(self) -> Dict[str, Any]:
+    """Convert the article to a JSON-serializable dict."""
+    return asdict(self)
+
+  @classmethod
+  def from_dict(cls, data: Dict[str, Any]) -> "Article":
+    """Create an article from a dict produced by `to_dict`."""
+    return cls(**{
+      **data,
+      'non_academic_authors': tuple(Author(**author) for author in data['non_academic_authors']),
+      'company_affiliations': tuple(data['company_affiliations']),
+    })
+
+# Columns of the results table, in order
+ROW_FIELDS = (
+  "PubmedID", "Title", "Publication Date", "Non-academic Author(s)", "Company Affiliation(s)", "Corresponding Author Email"
+)
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+try:
+  import aiohttp
+except ImportError:
+  aiohttp = None
+
+from pubmedfetcher.pubmed_fetcher.ratelimit import AsyncRateLimiter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from eutils_server import EutilsStandIn
+
+class SlowPagesStandIn(EutilsStandIn):
+  """Stand-in answering the efetch requests of the records after the first one after a second."""
+  def _efetch(self, params):
+    if not params.get('id', '').startswith('1,'):
+      time.sleep(1)
+    return super()._efetch(params)
+
+@unittest.skipIf(aiohttp is None, "AsyncEntrezQueries requires the `aiohttp` package")
+class AsyncEntrezQueriesTest(unittest.IsolatedAsyncioTestCase):
+  def client(self, server, **kwargs):
+    from pubmedfetcher.pubmed_fetcher.aio import AsyncEntrezQueries
+    # The request limits are those of the stand-in server, if any
+    kwargs.setdefault('rate_limiter', AsyncRateLimiter(rate=1000, burst=100))
+    return AsyncEntrezQueries(base_url=server.url, **kwargs)
+
+  async def test_retry_after(self):
+    with EutilsStandIn(articles=10, rate_limit=1) as server:
+      async with self.client(server, backoff_factor=0) as entrez:
+        await entrez.entrezInfo()
+        start = time.monotonic()
+        # Answered with 429 and Retry-After: 1, and retried once the second is over
+        await entrez.entrezInfo()
+        self.assertGreaterEqual(time.monotonic() - start, 0.9)
+    self.assertEqual(server.statuses, {200: 2, 429: 1})
+
+  async def test_retries_exhausted(self):
+    with EutilsStandIn(articles=10, error_rate=1.0) as server:
+      async with self.client(server, retries=2, backoff_factor=0) as entrez:
+        with self.assertRaises(aiohttp.ClientResponseError) as error:
+          await entrez.entrezInfo()
+    self.assertIn(error.exception.status, (500, 502, 503))
+    self.assertEqual(sum(server.statuses.values()), 3)
+
+  async def test_post_from_200_ids(self):
+    post, get = aiohttp.ClientSession.post, aiohttp.ClientSession.get
+    with EutilsStandIn(articles=10) as server:
+      for count, method in ((199, 'get'), (200, 'post')):
+        with self.subTest(ids=count):
+          with mock.patch.object(aiohttp.ClientSession, 'post', autospec=True, side_effect=post) as post_spy, \
+               mock.patch.object(aiohttp.ClientSession, 'get', autospec=True, side_effect=get) as get_spy:
+            async with self.client(server) as entrez:
+              # Single digit PMIDs, so the URL stays under the length switching to POST
+              body = await entrez.entrezFetch(id=['1'] * count, rettype='xml', retmode='text', raw=True)
+          self.assertEqual(body.count(b'<PubmedArticle>'), count)
+          self.assertEqual((post_spy.call_count, get_spy.call_count), (1, 0) if method == 'post' else (0, 1))
+
+  async def test_iter_articles_order(self):
+    # Random latency, so the concurrent pages complete out of order
+    with EutilsStandIn(articles=60, jitter=0.05) as server:
+      async with self.client(server) as entrez:
+        ids = [str(pmid) for pmid in range(60, 0, -1)]
+        articles = [article async for article in entrez.iter_articles(ids=ids, batch_size=7, concurrency=4)]
+        self.assertEqual([article.pubmed_id for article in articles], ids)
+
+        articles = [article async for article in entrez.iter_articles(term='cancer', max_records=45, batch_size=10, concurrency=3)]
+        self.assertEqual([article.pubmed_id for article in articles], [str(pmid) for pmid in range(1, 46)])
+
+  async def test_iter_articles_cancellation(self):
+    with SlowPagesStandIn(articles=100) as server:
+      async with self.client(server) as entrez:
+        articles = entrez.iter_articles(ids=range(1, 101), batch_size=10, concurrency=4)
+        await anext(articles)
+        # The pages fetched ahead of the consumer are still in flight
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        self.assertEqual(len(tasks), 3)
+        # Closing the iterator cancels them
+        await articles.aclose()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertTrue(all(task.cancelled() for task in tasks))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from pubmedfetcher.pubmed_fetcher.cache import DAY, HISTORY_TTL, HOUR, ResponseCache
+
+EUTILS = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils'
+ESEARCH = f'{EUTILS}/esearch.fcgi'
+EFETCH = f'{EUTILS}/efetch.fcgi'
+
+class ResponseCacheTest(unittest.TestCase):
+  def setUp(self):
+    temp_dir = tempfile.TemporaryDirectory()
+    self.addCleanup(temp_dir.cleanup)
+    self.dir = temp_dir.name
+
+    # The clock of the cache, moved forward by the tests
+    self.now = 1_000_000.0
+    patcher = mock.patch('pubmedfetcher.pubmed_fetcher.cache.time')
+    patcher.start().time.side_effect = lambda: self.now
+    self.addCleanup(patcher.stop)
+
+  def cache(self, **kwargs):
+    cache = ResponseCache(self.dir, **kwargs)
+    self.addCleanup(cache.close)
+    return cache
+
+  def test_key_normalization(self):
+    cache = self.cache()
+    cache.set(EFETCH, {'db': 'pubmed', 'id': '1,2', 'rettype': 'xml'}, b'articles')
+    # Parameter order, and the api_key, tool and email parameters, do not matter
+    self.assertEqual(cache.get(EFETCH, {'rettype': 'xml', 'id': '1,2', 'db': 'pubmed', 'api_key': 'key', 'tool': 'x', 'email': 'a@b.c'}), b'articles')
+    self.assertIsNone(cache.get(EFETCH, {'db': 'pubmed', 'id': '1,3', 'rettype': 'xml'}))
+    self.assertIsNone(cache.get(ESEARCH, {'db': 'pubmed', 'id': '1,2', 'rettype': 'xml'}))
+    self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+  def test_ttl_by_endpoint(self):
+    cache = self.cache()
+    search, fetch = {'db': 'pubmed', 'term': 'cancer'}, {'db': 'pubmed', 'id': '1'}
+    cache.set(ESEARCH, search, b'search')
+    cache.set(EFETCH, fetch, b'fetch')
+
+    self.now += HOUR - 1
+    self.assertEqual(cache.get(ESEARCH, search), b'search')
+    self.now += 1
+    self.assertIsNone(cache.get(ESEARCH, search))
+    self.assertEqual(cache.get(EFETCH, fetch), b'fetch')
+    self.now += 30 * DAY
+    self.assertIsNone(cache.get(EFETCH, fetch))
+
+  def test_history_ttl(self):
+    cache = self.cache()
+    page = {'db': 'pubmed', 'WebEnv': 'MCID_1', 'query_key': '1', 'retstart': '0', 'retmax': '500'}
+    cache.set(EFETCH, page, b'page')
+    self.now += HISTORY_TTL - 1
+    self.assertEqual(cache.get(EFETCH, page), b'page')
+    self.now += 1
+    self.assertIsNone(cache.get(EFETCH, page))
+
+  def test_ttl_override(self):
+    cache = self.cache(ttls={'efetch': DAY, 'esearch': 0})
+    cache.set(ESEARCH, {'term': 'cancer'}, b'search')
+    self.assertIsNone(cache.get(ESEARCH, {'term': 'cancer'}))
+    cache.set(EFETCH, {'id': '1'}, b'fetch')
+    self.now += DAY
+    self.assertIsNone(cache.get(EFETCH, {'id': '1'}))
+
+  def test_lru_eviction(self):
+    # Incompressible bodies of 100 bytes, two of which fit in the cache
+    bodies = {name: os.urandom(100) for name in 'abc'}
+    cache = self.cache(max_size=250)
+    cache.set(EFETCH, {'id': 'a'}, bodies['a'])
+    self.now += 1
+    cache.set(EFETCH, {'id': 'b'}, bodies['b'])
+    self.now += 1
+    self.assertEqual(cache.get(EFETCH, {'id': 'a'}), bodies['a'])
+    self.now += 1
+    # b is the least recently used response
+    cache.set(EFETCH, {'id': 'c'}, bodies['c'])
+    self.assertEqual(cache.get(EFETCH, {'id': 'a'}), bodies['a'])
+    self.assertIsNone(cache.get(EFETCH, {'id': 'b'}))
+    self.assertEqual(cache.get(EFETCH, {'id': 'c'}), bodies['c'])
+    self.assertEqual(cache.stats()['entries'], 2)
+
+  def test_hits_do_not_write(self):
+    cache = ResponseCache(self.dir)
+    cache.set(EFETCH, {'id': '1'}, b'fetch')
+    changes = cache._db.total_changes
+    self.now += 10
+    for _ in range(3):
+      self.assertEqual(cache.get(EFETCH, {'id': '1'}), b'fetch')
+    self.assertEqual(cache._db.total_changes, changes)
+
+    # The access time is written on close
+    cache.close()
+    with sqlite3.connect(cache.path) as db:
+      self.assertEqual(db.execute('SELECT accessed_at FROM responses').fetchone()[0], self.now)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,146 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from pubmedfetcher.pubmed_fetcher import main as main_module
+from pubmedfetcher.pubmed_fetcher.checkpoint import Checkpoint
+from pubmedfetcher.pubmed_fetcher.modules import EntrezQueries
+from pubmedfetcher.pubmed_fetcher.writers import CsvWriter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from eutils_server import EutilsStandIn
+
+ARTICLES = 60
+BATCH_SIZE = 10
+
+class Interrupted(Exception):
+  """Failure injected in the middle of a job."""
+
+class CheckpointTest(unittest.TestCase):
+  @classmethod
+  def setUpClass(cls):
+    cls.server = EutilsStandIn(articles=ARTICLES).start()
+
+  @classmethod
+  def tearDownClass(cls):
+    cls.server.stop()
+
+  def setUp(self):
+    temp_dir = tempfile.TemporaryDirectory()
+    self.addCleanup(temp_dir.cleanup)
+    self.dir = temp_dir.name
+    self.checkpoint = os.path.join(self.dir, 'job.ckpt.json')
+    self.ids = os.path.join(self.dir, 'ids.txt')
+    with open(self.ids, 'w') as file:
+      file.write('\n'.join(str(pmid) for pmid in range(1, ARTICLES + 1)))
+
+    # Point the E-utilities client at the stand-in server
+    init = EntrezQueries.__init__
+    def stand_in_init(entrez, *args, **kwargs):
+      init(entrez, *args, base_url=self.server.url, **kwargs)
+    patcher = mock.patch.object(EntrezQueries, '__init__', stand_in_init)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def run_main(self, *args):
+    """Run get-papers-list with `args`, returning its exit status and error output."""
+    argv = ['get-papers-list', *args, '-b', str(BATCH_SIZE), '--no-cache', '--api-key', 'test']
+    stderr = io.StringIO()
+    with mock.patch.object(sys, 'argv', argv), contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+      try:
+        main_module.main()
+      except SystemExit as e:
+        return e.code, stderr.getvalue()
+    return 0, stderr.getvalue()
+
+  def run_interrupted(self, *args, rows=25):
+    """Run a checkpointed job failing once `rows` rows are written, in the middle of a batch."""
+    write = CsvWriter.write
+    def failing_write(writer, row):
+      if writer.rows_written == rows:
+        raise Interrupted("interrupted")
+      write(writer, row)
+    with mock.patch.object(CsvWriter, 'write', failing_write):
+      status, _ = self.run_main(*args, '--checkpoint', self.checkpoint)
+    self.assertEqual(status, 1)
+
+  def read(self, path):
+    with open(path, 'rb') as file:
+      return file.read()
+
+  def test_resume_writes_the_same_output(self):
+    for name, job in (('search', ['cancer', '-max', str(ARTICLES)]), ('ids', ['-i', self.ids])):
+      with self.subTest(job=name):
+        reference = os.path.join(self.dir, f'{name}-reference.csv')
+        output = os.path.join(self.dir, f'{name}.csv')
+        self.assertEqual(self.run_main(*job, '-f', reference)[0], 0)
+
+        self.run_interrupted(*job, '-f', output)
+        state = Checkpoint(self.checkpoint).load()
+        self.assertEqual(state['completed'], 2 * BATCH_SIZE)
+        # The rows of the interrupted batch were written after the checkpoint
+        self.assertGreater(os.path.getsize(output), state['output_size'])
+
+        self.assertEqual(self.run_main(*job, '-f', output, '--checkpoint', self.checkpoint, '--resume')[0], 0)
+        self.assertEqual(self.read(output), self.read(reference))
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+  def test_resume_another_job(self):
+    output = os.path.join(self.dir, 'out.csv')
+    self.run_interrupted('cancer', '-max', str(ARTICLES), '-f', output)
+    written = self.read(output)
+    for job in (['diabetes', '-max', str(ARTICLES)], ['cancer', '-max', '50'], ['-i', self.ids]):
+      with self.subTest(job=job):
+        status, error = self.run_main(*job, '-f', output, '--checkpoint', self.checkpoint, '--resume')
+        self.assertEqual(status, 2)
+        self.assertIn('belongs to another job', error)
+        # Neither the output nor the checkpoint are modified
+        self.assertEqual(self.read(output), written)
+        self.assertEqual(Checkpoint(self.checkpoint).load()['completed'], 2 * BATCH_SIZE)
+
+  def test_resume_with_changed_ids_file(self):
+    output = os.path.join(self.dir, 'out.csv')
+    self.run_interrupted('-i', self.ids, '-f', output)
+    with open(self.ids, 'w') as file:
+      file.write('\n'.join(str(pmid) for pmid in range(ARTICLES, 0, -1)))
+    status, error = self.run_main('-i', self.ids, '-f', output, '--checkpoint', self.checkpoint, '--resume')
+    self.assertEqual(status, 2)
+    self.assertIn('has changed since the checkpoint', error)
+
+  def test_resume_with_truncated_output(self):
+    output = os.path.join(self.dir, 'out.csv')
+    self.run_interrupted('cancer', '-max', str(ARTICLES), '-f', output)
+    os.truncate(output, Checkpoint(self.checkpoint).load()['output_size'] - 1)
+    status, error = self.run_main('cancer', '-max', str(ARTICLES), '-f', output, '--checkpoint', self.checkpoint, '--resume')
+    self.assertEqual(status, 2)
+    self.assertIn('is missing the', error)
+
+  def test_corrupt_checkpoint(self):
+    output = os.path.join(self.dir, 'out.csv')
+    self.run_interrupted('cancer', '-max', str(ARTICLES), '-f', output)
+    with open(self.checkpoint) as file:
+      valid = file.read()
+    for name, content in (('truncated', valid[:len(valid) // 2]), ('empty', ''), ('missing keys', json.dumps({'job': {}})), ('not an object', '[]')):
+      with self.subTest(checkpoint=name):
+        with open(self.checkpoint, 'w') as file:
+          file.write(content)
+        with self.assertRaises(ValueError):
+          Checkpoint(self.checkpoint).load()
+        status, error = self.run_main('cancer', '-max', str(ARTICLES), '-f', output, '--checkpoint', self.checkpoint, '--resume')
+        self.assertEqual(status, 2)
+        self.assertIn('Invalid checkpoint', error)
+
+  def test_missing_checkpoint_starts_from_the_beginning(self):
+    output = os.path.join(self.dir, 'out.csv')
+    reference = os.path.join(self.dir, 'reference.csv')
+    self.assertEqual(self.run_main('cancer', '-max', str(ARTICLES), '-f', reference)[0], 0)
+    self.assertEqual(self.run_main('cancer', '-max', str(ARTICLES), '-f', output, '--checkpoint', self.checkpoint, '--resume')[0], 0)
+    self.assertEqual(self.read(output), self.read(reference))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from pubmedfetcher.pubmed_fetcher.classifier import AffiliationClassifier
+
+class AffiliationClassifierTest(unittest.TestCase):
+  def setUp(self):
+    self.classifier = AffiliationClassifier()
+
+  def assertVerdicts(self, classifier, verdicts):
+    for affiliation, academic in verdicts.items():
+      with self.subTest(affiliation=affiliation):
+        self.assertIs(classifier.is_academic(affiliation), academic)
+
+  def test_united_states_is_not_a_company(self):
+    self.assertVerdicts(self.classifier, {
+      "Department of Surgery, Harvard University, Boston, MA, U.S.A.": True,
+      "Yale University School of Medicine, 333 Cedar Street, New Haven, CT 06510, U.S.A.": True,
+      "Grifols S.A., Barcelona, Spain.": False,
+      "Janssen Vaccines & Prevention B.V., Leiden, The Netherlands.": False,
+    })
+
+  def test_company_keyword_takes_precedence(self):
+    self.assertVerdicts(self.classifier, {
+      "Eisai Inc., Global Research Lab, Nutley, NJ, USA.": False,
+      "F. Hoffmann-La Roche Ltd, University Hospital Basel, Switzerland.": False,
+      "Pharma Research Lab, Basel, Switzerland.": True,
+    })
+
+  def test_company_keywords_are_whole_words(self):
+    self.assertVerdicts(self.classifier, {
+      # "inc" within "Lincoln" and "corp" within "Corpus"
+      "University of Nebraska-Lincoln, Lincoln, NE, USA.": True,
+      "Faculty of Medicine, Corpus Christi College, Oxford, UK.": True,
+    })
+
+  def test_academic_keywords(self):
+    self.assertVerdicts(self.classifier, {
+      "Department of Biology, someone@mit.edu": True,
+      "Imperial College London, London, UK.": True,
+      "Institute of Cancer Research, London, UK.": True,
+      "Pfizer Worldwide Research and Development, Groton, CT, USA.": False,
+      "": False,
+      None: False,
+    })
+
+  def test_from_config(self):
+    with tempfile.NamedTemporaryFile('w', suffix='.toml', delete=False) as file:
+      file.write('[academic]\nkeywords = ["Hospital"]\n\n[company]\nkeywords = ["therapeutics", "AG"]\n')
+    self.addCleanup(os.remove, file.name)
+    classifier = AffiliationClassifier.from_config(file.name, cache_size=0)
+
+    self.assertVerdicts(classifier, {
+      "Massachusetts General Hospital, Boston, MA, USA.": True,
+      "Vertex Therapeutics, Boston University Research Park, MA, USA.": False,
+      "Bayer AG, Leverkusen, Germany.": False,
+      # The default keywords are kept
+      "Harvard University, Cambridge, MA, U.S.A.": True,
+      "Genentech, Inc., South San Francisco, CA, USA.": False,
+    })
+    self.assertNotEqual(classifier.fingerprint, self.classifier.fingerprint)
+    self.assertEqual(AffiliationClassifier.from_config(file.name).fingerprint, classifier.fingerprint)
+
+if __name__ == '__main__':
+  unittest.main()
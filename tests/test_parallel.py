@@ -0,0 +1,99 @@
+import io
+import os
+import re
+import unittest
+import xml.etree.ElementTree
+
+from pubmedfetcher.pubmed_fetcher.modules import PubmedArticleFetcher
+from pubmedfetcher.pubmed_fetcher.parallel import ArticleParserPool, _iter_article_fragments
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test_data.xml')
+
+# efetch response to an unknown WebEnv or query_key, sent with a 200 status
+FETCH_ERROR = (
+  b'<?xml version="1.0" encoding="UTF-8" ?>\n'
+  b'<!DOCTYPE eEfetchResult PUBLIC "-//NLM//DTD efetch 20131126//EN" "https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20131126/efetch.dtd">\n'
+  b'<eFetchResult>\n\t<ERROR>Unable to obtain query #1</ERROR>\n</eFetchResult>\n'
+)
+
+def _article_set(count: int) -> bytes:
+  """PubmedArticleSet of `count` articles, copies of those of `test_data.xml` with distinct PMIDs."""
+  with open(TEST_DATA, 'rb') as file:
+    data = file.read()
+  head, rest = data.split(b'<PubmedArticleSet>', 1)
+  articles = re.findall(rb'<PubmedArticle>.*?</PubmedArticle>', rest, re.DOTALL)
+  body = b'\n'.join(
+    re.sub(rb'<PMID Version="1">\d+</PMID>', b'<PMID Version="1">%d</PMID>' % (1000 + i), articles[i % len(articles)], count=1)
+    for i in range(count)
+  )
+  return head + b'<PubmedArticleSet>\n' + body + b'\n</PubmedArticleSet>\n'
+
+class IterArticleFragmentsTest(unittest.TestCase):
+  def setUp(self):
+    self.document = _article_set(25)
+    self.expected = []
+    for article in xml.etree.ElementTree.fromstring(self.document).findall('PubmedArticle'):
+      # The whitespace following the article is not part of its fragment
+      article.tail = None
+      self.expected.append(xml.etree.ElementTree.tostring(article))
+
+  def assertFragments(self, fragments):
+    self.assertEqual(len(fragments), len(self.expected))
+    for fragment, expected in zip(fragments, self.expected):
+      self.assertTrue(fragment.startswith(b'<PubmedArticle>'))
+      self.assertTrue(fragment.endswith(b'</PubmedArticle>'))
+      self.assertEqual(xml.etree.ElementTree.tostring(xml.etree.ElementTree.fromstring(fragment)), expected)
+
+  def test_read_size_boundaries(self):
+    # Read sizes splitting the tags, and the articles, at every possible offset
+    for read_size in (1, 2, 3, 7, 15, 16, 17, 64, 1000, 1 << 16):
+      with self.subTest(read_size=read_size):
+        self.assertFragments(list(_iter_article_fragments(io.BytesIO(self.document), read_size)))
+
+  def test_article_set_tag_is_not_an_article(self):
+    document = b'<?xml version="1.0" ?>\n<PubmedArticleSet>\n</PubmedArticleSet>\n'
+    for read_size in (1, 5, 1 << 16):
+      self.assertEqual(list(_iter_article_fragments(io.BytesIO(document), read_size)), [])
+    # The set tag split right after its `<PubmedArticle` prefix
+    prefix_end = self.document.index(b'<PubmedArticleSet>') + len(b'<PubmedArticle')
+    self.assertFragments(list(_iter_article_fragments(io.BytesIO(self.document), prefix_end)))
+
+  def test_file_name(self):
+    fragments = list(_iter_article_fragments(TEST_DATA))
+    self.assertEqual(len(fragments), 2)
+    self.assertEqual([fragment.count(b'<PubmedArticle>') for fragment in fragments], [1, 1])
+
+  def test_fetch_error(self):
+    for read_size in (1, 7, 1 << 16):
+      with self.subTest(read_size=read_size):
+        with self.assertRaisesRegex(ValueError, 'Unable to obtain query #1'):
+          list(_iter_article_fragments(io.BytesIO(FETCH_ERROR), read_size))
+    with self.assertRaisesRegex(ValueError, 'Unable to obtain query #1'):
+      list(PubmedArticleFetcher()._iter_article_details(io.BytesIO(FETCH_ERROR)))
+
+  def test_same_articles_as_the_serial_parser(self):
+    fetcher = PubmedArticleFetcher()
+    serial = list(fetcher._iter_article_details(io.BytesIO(self.document)))
+    fragments = _iter_article_fragments(io.BytesIO(self.document), read_size=100)
+    self.assertEqual([fetcher._fetch_article_details(xml.etree.ElementTree.fromstring(fragment)) for fragment in fragments], serial)
+
+class ArticleParserPoolTest(unittest.TestCase):
+  def test_same_articles_as_the_serial_parser(self):
+    document = _article_set(25)
+    serial = list(PubmedArticleFetcher()._iter_article_details(io.BytesIO(document)))
+    pool = ArticleParserPool(workers=2, chunk_size=4)
+    try:
+      self.assertEqual(list(pool._iter_article_details(io.BytesIO(document))), serial)
+    finally:
+      pool.close()
+
+  def test_fetch_error(self):
+    pool = ArticleParserPool(workers=1)
+    try:
+      with self.assertRaisesRegex(ValueError, 'Unable to obtain query #1'):
+        list(pool._iter_article_details(io.BytesIO(FETCH_ERROR)))
+    finally:
+      pool.close()
+
+if __name__ == '__main__':
+  unittest.main()
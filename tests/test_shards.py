@@ -0,0 +1,99 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from pubmedfetcher.pubmed_fetcher import shards
+from pubmedfetcher.pubmed_fetcher.shards import in_shard, merge_rows, parse_shard, shard_of
+from pubmedfetcher.types import ROW_FIELDS
+
+QUERIES_FIELD = "Matched Queries"
+
+class ShardTest(unittest.TestCase):
+  def test_shards_partition_the_ids(self):
+    ids = [str(pmid) for pmid in range(1, 5001)] + [str(pmid) for pmid in range(39_000_000, 39_001_000)]
+    for count in (1, 2, 3, 4, 7, 16):
+      with self.subTest(shards=count):
+        parts = [list(in_shard(ids, (index, count))) for index in range(count)]
+        self.assertEqual(sum(len(part) for part in parts), len(ids))
+        self.assertEqual(set().union(*parts), set(ids))
+        for part in parts:
+          # Each shard keeps the order of the ids
+          self.assertEqual(part, sorted(part, key=ids.index))
+          # and gets a fair share of them
+          self.assertLess(abs(len(part) - len(ids) / count), len(ids) / count * 0.2)
+
+  def test_shard_of_is_stable(self):
+    # CRC-32 of the PMIDs: the assignment must not change between versions, hosts or processes
+    self.assertEqual([shard_of(str(pmid), 4) for pmid in range(1, 9)], [3, 1, 3, 0, 2, 0, 2, 3])
+    self.assertEqual(shard_of(' 12345\n', 7), shard_of('12345', 7))
+    self.assertEqual(shard_of(12345, 7), shard_of('12345', 7))
+
+  def test_parse_shard(self):
+    self.assertEqual(parse_shard('0/4'), (0, 4))
+    self.assertEqual(parse_shard('3/4'), (3, 4))
+    self.assertEqual(parse_shard('0/1'), (0, 1))
+    for value in ('3/3', '4/3', '-1/3', '0/0', 'a/b', '1/2/3', '1', ''):
+      with self.subTest(value=value):
+        with self.assertRaises(argparse.ArgumentTypeError):
+          parse_shard(value)
+
+class MergeRowsTest(unittest.TestCase):
+  def setUp(self):
+    temp_dir = tempfile.TemporaryDirectory()
+    self.addCleanup(temp_dir.cleanup)
+    self.dir = temp_dir.name
+
+  def row(self, pmid, title, **fields):
+    return {**dict.fromkeys(ROW_FIELDS, ''), 'PubmedID': pmid, 'Title': title, **fields}
+
+  def write_csv(self, name, fieldnames, rows):
+    path = os.path.join(self.dir, name)
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+      writer = csv.DictWriter(file, fieldnames=fieldnames, lineterminator='\n')
+      writer.writeheader()
+      writer.writerows(rows)
+    return path
+
+  def write_jsonl(self, name, rows):
+    path = os.path.join(self.dir, name)
+    with open(path, 'w', encoding='utf-8') as file:
+      for row in rows:
+        file.write(json.dumps(row) + '\n')
+    return path
+
+  def inputs(self):
+    first = self.write_csv('shard-0.csv', ROW_FIELDS, [self.row('100', 'first'), self.row('9', 'nine'), self.row('10', 'ten')])
+    second = self.write_jsonl('shard-1.jsonl', [
+      self.row('10', 'duplicate', **{QUERIES_FIELD: 'cancer'}), self.row('2', 'two', **{QUERIES_FIELD: 'cancer; crispr'}),
+    ])
+    return first, second
+
+  def test_merge_rows(self):
+    fieldnames, rows = merge_rows(self.inputs())
+    self.assertEqual(fieldnames, list(ROW_FIELDS) + [QUERIES_FIELD])
+    # Sorted by numeric PMID, not as strings
+    self.assertEqual([row['PubmedID'] for row in rows], ['2', '9', '10', '100'])
+    # The first row of a paper is kept
+    self.assertEqual(rows[2]['Title'], 'ten')
+    self.assertNotIn(QUERIES_FIELD, rows[2])
+    self.assertEqual(rows[0][QUERIES_FIELD], 'cancer; crispr')
+
+  def test_merge_papers_list(self):
+    output = os.path.join(self.dir, 'merged.csv')
+    with mock.patch.object(sys, 'argv', ['merge-papers-list', *self.inputs(), '-f', output]), mock.patch('builtins.print'):
+      shards.main()
+    with open(output, newline='', encoding='utf-8') as file:
+      reader = csv.DictReader(file)
+      rows = list(reader)
+    self.assertEqual(reader.fieldnames, list(ROW_FIELDS) + [QUERIES_FIELD])
+    self.assertEqual([(row['PubmedID'], row['Title'], row[QUERIES_FIELD]) for row in rows], [
+      ('2', 'two', 'cancer; crispr'), ('9', 'nine', ''), ('10', 'ten', ''), ('100', 'first', ''),
+    ])
+
+if __name__ == '__main__':
+  unittest.main()